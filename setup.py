@@ -3,21 +3,29 @@ from setuptools import setup, find_packages
 setup(
     name="youtube-playlist-analyzer",
     version="0.1.0",
-    packages=find_packages(where="src"),
+    packages=find_packages(where="src", exclude=["tests", "tests.*", "*.bak", "scripts*"]),
     package_dir={"": "src"},
     install_requires=[
         "python-dotenv>=1.0.0",
         "langchain>=0.1.0",
-        "langchain-community>=0.0.13",
         "youtube-transcript-api>=0.6.1",
         "yt-dlp>=2024.3.10",
+        "cachetools>=5.3.0",
+        "orjson>=3.9",
+        "httpx>=0.25.0",
     ],
     extras_require={
         'dev': [
             'pytest>=7.4.3',
             'pytest-cov>=4.1.0',
             'pytest-mock>=3.12.0',
+            'pytest-xdist>=3.5.0',
             'responses>=0.24.1',
+        ],
+        # Faster GPU detection without spawning nvidia-smi or system_profiler
+        'gpu': [
+            'nvidia-ml-py>=12.0.0',
+            'pyobjc-framework-Metal>=10.0; sys_platform == "darwin"',
         ]
     }
 ) 
\ No newline at end of file
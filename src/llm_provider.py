@@ -9,38 +9,125 @@ You may obtain a copy of the License at
     https://opensource.org/licenses/MIT
 """
 
-import json
-from typing import Optional, Dict, List
+import asyncio
+import re
+import types
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, cached_property
+from typing import Optional, Dict, List, Union, Iterator, Any
 from abc import ABC, abstractmethod
 from langchain_ollama import OllamaLLM
+import httpx
 import boto3
-from pydantic import BaseModel, Field
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from pydantic import BaseModel, ConfigDict, Field
+from cachetools import LRUCache
+import orjson
 import time
-from rich.console import Console, ConsoleOptions, RenderResult
-from rich.live import Live
+from rich.console import Console
 from rich.style import Style
 import random
-import json
+
+__all__ = [
+    "LLMConfig",
+    "RetryConfig",
+    "BaseLLM",
+    "BedrockWrapper",
+    "OllamaWrapper",
+    "LLMProvider",
+]
 
 # Create a separate console for cost logging that doesn't interfere with progress bars
 cost_console = Console(stderr=True, style=Style(color="blue"))
 
-# Claude model costs per 1K input/output tokens (as of March 2024)
+# Bedrock model costs per 1K input/output/cached tokens (as of March 2024).
+# Cache reads bill at ~10% of the input rate, cache writes at ~125%.
 BEDROCK_COSTS = {
-    "anthropic.claude-3-sonnet-20240229-v1:0": {"input": 0.003, "output": 0.015},
-    "anthropic.claude-3-haiku-20240307-v1:0": {"input": 0.0008, "output": 0.004},
+    "anthropic.claude-3-sonnet-20240229-v1:0": {
+        "input": 0.003, "output": 0.015, "cache_read": 0.0003, "cache_write": 0.00375
+    },
+    "anthropic.claude-3-haiku-20240307-v1:0": {
+        "input": 0.0008, "output": 0.004, "cache_read": 0.00008, "cache_write": 0.001
+    },
+    "amazon.nova-lite-v1:0": {
+        "input": 0.00006, "output": 0.00024, "cache_read": 0.000015, "cache_write": 0.00006
+    },
 }
 
+# Friendly model names mapped to provider model IDs
+_BEDROCK_MODEL_MAP = types.MappingProxyType({
+    "claude": "anthropic.claude-3-haiku-20240307-v1:0",
+    "claude-haiku": "anthropic.claude-3-haiku-20240307-v1:0",
+    "nova": "amazon.nova-lite-v1:0",
+})
+_OLLAMA_MODEL_MAP = types.MappingProxyType({
+    "llama3.2": "llama3.2",
+    "mistral": "mistral",
+})
+_BEDROCK_MODELS = frozenset(_BEDROCK_MODEL_MAP)
+_OLLAMA_MODELS = frozenset(_OLLAMA_MODEL_MAP)
+
+# Error messages and Bedrock error codes worth retrying
+_RETRY_RE = re.compile(
+    r'(throttling|too\s*many\s*tokens|rate\s*exceeded|timeout|connection|temporarily\s*unavailable)',
+    re.I
+)
+_RETRY_CODES = frozenset({
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'ModelTimeoutException',
+})
+
+@lru_cache(maxsize=None)
+def _get_boto_session(region: Optional[str] = None) -> boto3.session.Session:
+    """Get a boto3 session, shared per region so credentials are resolved once."""
+    return boto3.session.Session(region_name=region)
+
+def _bedrock_client_config(max_attempts: int, pool_connections: int) -> Config:
+    """Client config using botocore's adaptive (token bucket) retry mode.
+    
+    The connection pool is sized for concurrent invocations so they reuse
+    warm keep-alive connections instead of queueing on the default pool of 10.
+    """
+    return Config(
+        retries={'mode': 'adaptive', 'max_attempts': max_attempts},
+        read_timeout=120,
+        connect_timeout=10,
+        tcp_keepalive=True,
+        max_pool_connections=pool_connections
+    )
+
+@lru_cache(maxsize=8)
+def _get_bedrock_client(
+    service: str,
+    region: Optional[str] = None,
+    max_attempts: int = 5,
+    pool_connections: int = 32
+):
+    """Get a shared client so botocore service models are only loaded once."""
+    return _get_boto_session(region).client(
+        service, config=_bedrock_client_config(max_attempts, pool_connections)
+    )
+
 class RetryConfig(BaseModel):
     """Configuration for retry behavior."""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+    
     max_retries: int = Field(default=5)
     initial_delay: float = Field(default=2.0)
     max_delay: float = Field(default=60.0)
-    exponential_base: float = Field(default=2.0)
-    jitter: float = Field(default=0.2)
 
 class LLMConfig(BaseModel):
-    """Configuration for the LLM."""
+    """Configuration for the LLM.
+    
+    Frozen so configs are hashable and can key caches of derived settings.
+    """
+    model_config = ConfigDict(frozen=True, extra='forbid')
+    
     model: str = Field(default="llama3.2")
     temperature: float = Field(default=0.7)
     format: str = Field(default="json")
@@ -48,37 +135,87 @@ class LLMConfig(BaseModel):
     num_ctx: int = Field(default=16384)
     repeat_last_n: int = Field(default=2)
     num_gpu: int = Field(default=0)
+    latency: str = Field(default="standard")  # Bedrock only: "standard" or "optimized"
+    prompt_cache: bool = Field(default=True)  # Bedrock only: cache shared system prompts
+    pool_connections: int = Field(default=32)  # HTTP connection pool size
+    response_cache_size: int = Field(default=1024)  # Cached zero-temperature responses, 0 disables
+    cost_log_interval: int = Field(default=1)  # Bedrock only: log costs every N invocations
     retry: RetryConfig = Field(default_factory=RetryConfig)
 
 class BaseLLM(ABC):
     def __init__(self, config: LLMConfig):
         self.retry_config = config.retry
+        self.model_id = config.model
+        self.temperature = config.temperature
+        # Identical prompts at temperature 0 always get the same answer, so keep them
+        self._response_cache = LRUCache(maxsize=config.response_cache_size) if config.response_cache_size > 0 else None
+        self._response_cache_lock = threading.Lock()
+        # Per-instance RNG so concurrent retries don't contend on the global one
+        self._rng = random.Random()
+        self.pool_connections = config.pool_connections
     
     @abstractmethod
-    def _raw_invoke(self, prompt: str) -> str:
-        """Raw invocation without retries."""
+    def _raw_invoke(self, prompt: str, system: Optional[str] = None) -> str:
+        """Raw invocation without retries.
+        
+        `system` carries instructions shared across prompts, which providers
+        that support it can cache between invocations.
+        """
         pass
     
     def _should_retry(self, error: Exception) -> bool:
         """Determine if the error is retryable."""
-        error_str = str(error).lower()
-        return any(msg in error_str for msg in [
-            'throttlingexception',
-            'too many tokens',
-            'rate exceeded',
-            'timeout',
-            'connection',
-            'temporarily unavailable'
-        ])
-    
-    def invoke(self, prompt: str) -> str:
+        if isinstance(error, ClientError) and error.response.get('Error', {}).get('Code') in _RETRY_CODES:
+            return True
+        return bool(_RETRY_RE.search(str(error)))
+    
+    def _retry_delay(self, previous_delay: float) -> float:
+        """Calculate the wait before the next attempt using decorrelated jitter."""
+        return min(
+            self.retry_config.max_delay,
+            self._rng.uniform(self.retry_config.initial_delay, previous_delay * 3)
+        )
+    
+    def _cache_key(self, prompt: str, system: Optional[str] = None) -> Optional[bytes]:
+        """Content-address a request, or return None when it must not be cached."""
+        if self._response_cache is None or self.temperature != 0:
+            return None
+        return hashlib.blake2b(
+            f'{self.model_id}|{self.temperature}|{system or ""}|{prompt}'.encode(),
+            digest_size=16
+        ).digest()
+    
+    def _get_cached_response(self, key: Optional[bytes]) -> Optional[str]:
+        if key is None:
+            return None
+        with self._response_cache_lock:
+            return self._response_cache.get(key)
+    
+    def _store_cached_response(self, key: Optional[bytes], response: str) -> None:
+        if key is None:
+            return
+        with self._response_cache_lock:
+            self._response_cache[key] = response
+    
+    def invoke(self, prompt: str, system: Optional[str] = None) -> str:
+        """Invoke the model, reusing the cached response for a repeated prompt."""
+        key = self._cache_key(prompt, system)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            return cached
+        
+        response = self._invoke(prompt, system)
+        self._store_cached_response(key, response)
+        return response
+    
+    def _invoke(self, prompt: str, system: Optional[str] = None) -> str:
         """Invoke with exponential backoff retry logic."""
         delay = self.retry_config.initial_delay
         last_exception = None
         
         for attempt in range(self.retry_config.max_retries):
             try:
-                return self._raw_invoke(prompt)
+                return self._raw_invoke(prompt, system)
             except Exception as e:
                 last_exception = e
                 
@@ -86,122 +223,477 @@ class BaseLLM(ABC):
                     cost_console.log(f"[red]Error not retryable or max retries reached. Last error: {str(e)}[/red]")
                     raise
                 
-                # Calculate delay with jitter
-                jitter = random.uniform(
-                    -self.retry_config.jitter * delay,
-                    self.retry_config.jitter * delay
-                )
+                current_delay = self._retry_delay(delay)
                 
-                # Ensure minimum delay and respect max delay
-                current_delay = min(
-                    max(delay + jitter, self.retry_config.initial_delay),
-                    self.retry_config.max_delay
+                cost_console.log(
+                    f"[yellow]Attempt {attempt + 1} failed with throttling, "
+                    f"waiting {current_delay:.2f} seconds before retry: {str(e)}[/yellow]"
                 )
                 
+                time.sleep(current_delay)
+                delay = current_delay
+        
+        raise Exception(f"Max retries exceeded. Last error: {str(last_exception)}")
+    
+    def invoke_stream(self, prompt: str, system: Optional[str] = None) -> Iterator[str]:
+        """Yield the response as it is generated, or the cached response at once."""
+        key = self._cache_key(prompt, system)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        for chunk in self._invoke_stream(prompt, system):
+            chunks.append(chunk)
+            yield chunk
+        self._store_cached_response(key, ''.join(chunks))
+    
+    def _invoke_stream(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Stream the response; providers without streaming yield it all at once."""
+        yield self._invoke(prompt, system)
+    
+    # Whether `invoke_json` may abandon a stream once it holds a complete JSON object
+    _stop_stream_early = True
+    
+    def invoke_json(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> str:
+        """Invoke the model for a short JSON answer, stopping once a complete object has arrived.
+        
+        `max_tokens` caps generation where the provider supports it.
+        """
+        key = self._cache_key(prompt, system)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            return cached
+        
+        chunks = []
+        stream = self._invoke_stream(prompt, system, max_tokens)
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                if self._stop_stream_early and '}' in chunk:
+                    candidate = self._complete_json(''.join(chunks))
+                    if candidate is None:
+                        continue
+                    self._store_cached_response(key, candidate)
+                    return candidate
+        finally:
+            # Closing the stream ends the request, so the model stops generating
+            stream.close()
+        
+        response = ''.join(chunks)
+        if max_tokens is None:
+            # A capped response may be truncated, so only full responses are reused
+            self._store_cached_response(key, response)
+        return response
+    
+    @staticmethod
+    def _complete_json(text: str) -> Optional[str]:
+        """Return `text` up to its last '}' if that forms a complete JSON value, otherwise None."""
+        text = text.strip()
+        if '}' not in text:
+            return None
+        candidate = text[:text.rindex('}') + 1]
+        try:
+            orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            return None
+        return candidate
+    
+    @cached_property
+    def _executor(self) -> ThreadPoolExecutor:
+        """Threads that async calls run the sync client on, kept across event loops."""
+        return ThreadPoolExecutor(max_workers=self.pool_connections, thread_name_prefix="llm")
+    
+    def close(self) -> None:
+        """Release the provider's network resources."""
+        if '_executor' in self.__dict__:
+            self._executor.shutdown()
+    
+    @abstractmethod
+    async def _raw_ainvoke(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> str:
+        """Raw asynchronous invocation without retries, capped at `max_tokens` where supported."""
+        pass
+    
+    async def ainvoke(self, prompt: str, system: Optional[str] = None) -> str:
+        """Asynchronous `invoke`, sharing the same response cache."""
+        key = self._cache_key(prompt, system)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            return cached
+        
+        response = await self._ainvoke(prompt, system)
+        self._store_cached_response(key, response)
+        return response
+    
+    async def ainvoke_json(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> str:
+        """Asynchronous `invoke_json`; the response arrives whole, then is trimmed to its JSON object."""
+        key = self._cache_key(prompt, system)
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            return cached
+        
+        response = await self._ainvoke(prompt, system, max_tokens)
+        candidate = self._complete_json(response)
+        if candidate is not None:
+            self._store_cached_response(key, candidate)
+            return candidate
+        if max_tokens is None:
+            # A capped response may be truncated, so only full responses are reused
+            self._store_cached_response(key, response)
+        return response
+    
+    async def _ainvoke(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> str:
+        """Asynchronous invoke with the same exponential backoff as `invoke`."""
+        delay = self.retry_config.initial_delay
+        last_exception = None
+        
+        for attempt in range(self.retry_config.max_retries):
+            try:
+                return await self._raw_ainvoke(prompt, system, max_tokens)
+            except Exception as e:
+                last_exception = e
+                
+                if not self._should_retry(e) or attempt == self.retry_config.max_retries - 1:
+                    cost_console.log(f"[red]Error not retryable or max retries reached. Last error: {str(e)}[/red]")
+                    raise
+                
+                current_delay = self._retry_delay(delay)
+                
                 cost_console.log(
                     f"[yellow]Attempt {attempt + 1} failed with throttling, "
                     f"waiting {current_delay:.2f} seconds before retry: {str(e)}[/yellow]"
                 )
                 
-                time.sleep(current_delay)
-                delay = min(delay * self.retry_config.exponential_base, self.retry_config.max_delay)
+                await asyncio.sleep(current_delay)
+                delay = current_delay
         
         raise Exception(f"Max retries exceeded. Last error: {str(last_exception)}")
+    
+    async def abatch(
+        self,
+        prompts: List[str],
+        concurrency: int = 8,
+        system: Optional[str] = None
+    ) -> List[Union[str, BaseException]]:
+        """Invoke several prompts concurrently, at most `concurrency` in flight.
+        
+        Results keep the order of `prompts`; a failed prompt yields its exception
+        instead of cancelling the rest of the batch.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _bounded_ainvoke(prompt: str) -> str:
+            async with semaphore:
+                return await self.ainvoke(prompt, system)
+        
+        return await asyncio.gather(
+            *(_bounded_ainvoke(prompt) for prompt in prompts),
+            return_exceptions=True
+        )
 
 class OllamaWrapper(BaseLLM):
     def __init__(self, config: LLMConfig):
         super().__init__(config)
-        # Map friendly names to Ollama model names
-        model_name = self._get_ollama_model_id(config.model)
-        config_dict = config.model_dump(exclude={'retry'})
-        config_dict['model'] = model_name
-        self.llm = OllamaLLM(**config_dict)
+        self.model_id = _ollama_kwargs(config)['model']
+        # Copying the validated prototype skips re-running OllamaLLM's validators;
+        # only the clients are rebuilt, so this wrapper owns the ones it closes
+        self.llm = _ollama_prototype(config).model_copy()
+        self.llm._set_clients()
+        # Copies of `llm` with generation capped at a number of tokens, by cap
+        self._capped_llms: Dict[int, OllamaLLM] = {}
     
-    def _get_ollama_model_id(self, model: str) -> str:
+    @staticmethod
+    def _get_ollama_model_id(model: str) -> str:
         """Map friendly model names to Ollama model IDs."""
-        model_map = {
-            "llama3.2": "llama3.2",
-            "mistral": "mistral",
-        }
-        return model_map.get(model, model)
+        return _OLLAMA_MODEL_MAP.get(model, model)
+    
+    def _format_prompt(self, prompt: str, system: Optional[str] = None) -> str:
+        """Ollama completions take a single prompt, so prepend any system text."""
+        return f"{system}\n\n{prompt}" if system else prompt
     
-    def _raw_invoke(self, prompt: str) -> str:
-        return self.llm.invoke(prompt)
+    def _raw_invoke(self, prompt: str, system: Optional[str] = None) -> str:
+        return self.llm.invoke(self._format_prompt(prompt, system))
+    
+    def _capped_llm(self, max_tokens: Optional[int]) -> OllamaLLM:
+        """Return `llm`, or a copy of it that generates at most `max_tokens` tokens."""
+        if max_tokens is None:
+            return self.llm
+        llm = self._capped_llms.get(max_tokens)
+        if llm is None:
+            llm = self._capped_llms[max_tokens] = self.llm.model_copy(update={"num_predict": max_tokens})
+        return llm
+    
+    def _invoke_stream(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Stream tokens from Ollama, with `max_tokens` applied as `num_predict`."""
+        llm = self._capped_llm(max_tokens)
+        started = False
+        try:
+            for chunk in llm.stream(self._format_prompt(prompt, system)):
+                started = True
+                yield chunk
+        except Exception:
+            if started:
+                raise
+            # Nothing was streamed yet, so fall back to the retrying invoke
+            yield self._invoke(prompt, system)
+    
+    def close(self) -> None:
+        """Close this wrapper's sync and async HTTP clients; other wrappers keep theirs."""
+        super().close()
+        self.llm._client.close()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.llm._async_client.close())
+        else:
+            loop.create_task(self.llm._async_client.close())
+    
+    async def _raw_ainvoke(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> str:
+        # The async client's connections are bound to the loop that opened them, and
+        # each batch runs its own loop, so run the sync client on the wrapper's threads
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._capped_llm(max_tokens).invoke, self._format_prompt(prompt, system)
+        )
+
+@lru_cache(maxsize=8)
+def _ollama_kwargs(config: LLMConfig) -> Dict[str, Any]:
+    """Build the OllamaLLM arguments once per distinct config (treat as read-only)."""
+    return {
+        # Map friendly names to Ollama model names
+        "model": OllamaWrapper._get_ollama_model_id(config.model),
+        "temperature": config.temperature,
+        "format": config.format,
+        "num_thread": config.num_thread,
+        "num_ctx": config.num_ctx,
+        "repeat_last_n": config.repeat_last_n,
+        "num_gpu": config.num_gpu,
+        # Keep connections to the Ollama server alive for reuse across calls; generation
+        # on CPU can be slow, so only connecting is bounded in time
+        "client_kwargs": {
+            "limits": httpx.Limits(
+                max_connections=config.pool_connections,
+                max_keepalive_connections=config.pool_connections
+            ),
+            "timeout": httpx.Timeout(None, connect=10.0),
+        },
+    }
+
+@lru_cache(maxsize=8)
+def _ollama_prototype(config: LLMConfig) -> OllamaLLM:
+    """Validate an OllamaLLM once per distinct config.
+    
+    Wrappers copy this fully validated instance and then build their own
+    Ollama HTTP clients on the copy, so the prototype's clients stay unused.
+    """
+    return OllamaLLM(**_ollama_kwargs(config))
 
 class BedrockWrapper(BaseLLM):
-    def __init__(self, config: LLMConfig):
+    def __init__(self, config: LLMConfig, boto_session: Optional[boto3.session.Session] = None):
         super().__init__(config)
-        self.client = boto3.client('bedrock-runtime')
+        # Throttling is retried by botocore's adaptive mode rather than the Python loop
+        self.max_attempts = config.retry.max_retries
+        self.client_config = _bedrock_client_config(self.max_attempts, self.pool_connections)
+        self._boto_session = boto_session
         self.model_id = self._get_bedrock_model_id(config.model)
-        self.temperature = config.temperature
         self.max_tokens = config.num_ctx
+        self.latency = config.latency
+        self.prompt_cache = config.prompt_cache and self._supports_prompt_cache()
         self.total_cost = 0.0
+        self.invocations = 0
+        self.cost_log_interval = max(1, config.cost_log_interval)
+        # Invocations complete on worker threads and event loop tasks concurrently
+        self._cost_lock = threading.Lock()
+    
+    @cached_property
+    def client(self):
+        """The bedrock-runtime client, created on first use rather than at construction."""
+        # Use the injected session if any, otherwise the shared cached client
+        if self._boto_session is not None:
+            return self._boto_session.client('bedrock-runtime', config=self.client_config)
+        return _get_bedrock_client(
+            'bedrock-runtime',
+            max_attempts=self.max_attempts,
+            pool_connections=self.pool_connections
+        )
     
-    def _get_bedrock_model_id(self, model: str) -> str:
+    @staticmethod
+    def _get_bedrock_model_id(model: str) -> str:
         """Map friendly model names to Bedrock model IDs."""
-        model_map = {
-            "claude": "anthropic.claude-3-haiku-20240307-v1:0",
-            "claude-haiku": "anthropic.claude-3-haiku-20240307-v1:0",
-        }
-
-        model_id = model_map.get(model, model)
+        model_id = _BEDROCK_MODEL_MAP.get(model, model)
         if not model_id:
             raise ValueError(f"Unknown model: {model}")
         return model_id
     
-    def _calculate_cost(self, input_tokens: int, output_tokens: int) -> float:
+    def _supports_prompt_cache(self) -> bool:
+        """Check whether the model accepts cache points (Claude models and inference profile ARNs)."""
+        return 'claude' in self.model_id or (
+            self.model_id.startswith('arn:') and 'inference-profile' in self.model_id
+        )
+    
+    def _is_cache_rejection(self, error: Exception) -> bool:
+        """Check whether Bedrock rejected the request because of the cache point."""
+        return (
+            self.prompt_cache
+            and isinstance(error, ClientError)
+            and error.response.get('Error', {}).get('Code') == 'ValidationException'
+            and 'cach' in str(error).lower()
+        )
+    
+    def _disable_prompt_cache(self) -> None:
+        cost_console.log(
+            f"[yellow]Prompt caching is not available for {self.model_id}, "
+            f"sending uncached requests[/yellow]"
+        )
+        self.prompt_cache = False
+    
+    def _calculate_cost(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0
+    ) -> float:
         """Calculate cost for a model invocation."""
         if self.model_id not in BEDROCK_COSTS:
-            console.log(f"[yellow]Warning: No cost information for model {self.model_id}[/yellow]")
+            cost_console.log(f"[yellow]Warning: No cost information for model {self.model_id}[/yellow]")
             return 0.0
         
         rates = BEDROCK_COSTS[self.model_id]
         input_cost = (input_tokens / 1000) * rates["input"]
         output_cost = (output_tokens / 1000) * rates["output"]
-        total_cost = input_cost + output_cost
+        cache_read_cost = (cache_read_tokens / 1000) * rates.get("cache_read", rates["input"])
+        cache_write_cost = (cache_write_tokens / 1000) * rates.get("cache_write", rates["input"])
+        total_cost = input_cost + output_cost + cache_read_cost + cache_write_cost
         
         return total_cost
     
-    def _raw_invoke(self, prompt: str) -> str:
-        """Raw invocation using Claude models with cost tracking."""
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": self.max_tokens,
-            "temperature": self.temperature,
+    def _converse_kwargs(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> dict:
+        """Build the Converse API request for a prompt."""
+        kwargs = {
+            "modelId": self.model_id,
             "messages": [
                 {
                     "role": "user",
-                    "content": prompt
+                    "content": [{"text": prompt}]
                 }
-            ]
+            ],
+            "inferenceConfig": {
+                "maxTokens": max_tokens or self.max_tokens,
+                "temperature": self.temperature
+            }
         }
+        if system:
+            # The cache point lets Bedrock reuse the shared instructions across videos
+            kwargs["system"] = [{"text": system}]
+            if self.prompt_cache:
+                kwargs["system"].append({"cachePoint": {"type": "default"}})
+        if self.latency != "standard":
+            kwargs["performanceConfig"] = {"latency": self.latency}
+        return kwargs
+    
+    def _record_usage(self, usage: dict) -> None:
+        """Track and log the cost of an invocation from its Converse usage."""
+        # Extract token counts and calculate cost
+        input_tokens = usage.get('inputTokens', 0)
+        output_tokens = usage.get('outputTokens', 0)
+        cache_read_tokens = usage.get('cacheReadInputTokens', 0)
+        cache_write_tokens = usage.get('cacheWriteInputTokens', 0)
+        invocation_cost = self._calculate_cost(
+            input_tokens, output_tokens, cache_read_tokens, cache_write_tokens
+        )
+        with self._cost_lock:
+            self.total_cost += invocation_cost
+            self.invocations += 1
+            total_cost = self.total_cost
+            should_log = self.invocations % self.cost_log_interval == 0
+        
+        if not should_log:
+            return
+        
+        # Log the cost information to stderr to avoid progress bar interference
+        cost_console.log(
+            f"\nBedrock invocation cost: ${invocation_cost:.4f} "
+            f"(Input: {input_tokens} tokens, Output: {output_tokens} tokens, "
+            f"Cache read: {cache_read_tokens} tokens, Cache write: {cache_write_tokens} tokens) "
+            f"Total Cost accumulated in this session: ${total_cost:.4f}"
+        )
+    
+    def _handle_response(self, response: dict) -> str:
+        """Track the cost of a Converse response and return its text."""
+        self._record_usage(response.get('usage', {}))
+        return response['output']['message']['content'][0]['text']
+    
+    def _raw_invoke_stream(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Stream text deltas through the Converse streaming API with cost tracking.
         
+        Usage arrives in the final metadata event, so the cost is only recorded
+        once the stream has been consumed.
+        """
         try:
-            response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(request_body)
-            )
-            response_body = json.loads(response['body'].read())
-            
-            # Extract token counts and calculate cost
-            input_tokens = response_body.get('usage', {}).get('input_tokens', 0)
-            output_tokens = response_body.get('usage', {}).get('output_tokens', 0)
-            invocation_cost = self._calculate_cost(input_tokens, output_tokens)
-            self.total_cost += invocation_cost
+            try:
+                response = self.client.converse_stream(**self._converse_kwargs(prompt, system, max_tokens))
+            except ClientError as e:
+                if not self._is_cache_rejection(e):
+                    raise
+                self._disable_prompt_cache()
+                response = self.client.converse_stream(**self._converse_kwargs(prompt, system, max_tokens))
             
-            # Log the cost information to stderr to avoid progress bar interference
-            cost_console.log(
-                f"\nBedrock invocation cost: ${invocation_cost:.4f} "
-                f"(Input: {input_tokens} tokens, Output: {output_tokens} tokens) "
-                f"Total Cost accumulated in this session: ${self.total_cost:.4f}"
-            )
+            for event in response['stream']:
+                if 'contentBlockDelta' in event:
+                    yield event['contentBlockDelta']['delta'].get('text', '')
+                elif 'metadata' in event:
+                    self._record_usage(event['metadata'].get('usage', {}))
             
-            return response_body['content'][0]['text']
+        except Exception as e:
+            cost_console.log(f"\n[red]Error invoking Bedrock model: {str(e)}[/red]")
+            raise
+    
+    def _raw_invoke(self, prompt: str, system: Optional[str] = None) -> str:
+        """Raw invocation through the Converse streaming API with cost tracking."""
+        return ''.join(self._raw_invoke_stream(prompt, system))
+    
+    def _raw_converse(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> str:
+        """Raw invocation through the non-streaming Converse API with cost tracking."""
+        try:
+            try:
+                response = self.client.converse(**self._converse_kwargs(prompt, system, max_tokens))
+            except ClientError as e:
+                if not self._is_cache_rejection(e):
+                    raise
+                self._disable_prompt_cache()
+                response = self.client.converse(**self._converse_kwargs(prompt, system, max_tokens))
+            return self._handle_response(response)
             
         except Exception as e:
             cost_console.log(f"\n[red]Error invoking Bedrock model: {str(e)}[/red]")
             raise
     
+    async def _raw_ainvoke(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> str:
+        """Raw asynchronous invocation, running the cached client on the wrapper's threads.
+        
+        Sharing the sync client keeps its connection pool and adaptive retry
+        state for async traffic, instead of opening a client per request.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._raw_converse, prompt, system, max_tokens)
+    
+    # Usage and cost arrive in the final stream event, so streams are always consumed
+    _stop_stream_early = False
+    
+    def _invoke_stream(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Stream once; the client's adaptive retry mode handles throttling."""
+        return self._raw_invoke_stream(prompt, system, max_tokens)
+    
+    def _invoke(self, prompt: str, system: Optional[str] = None) -> str:
+        """Invoke once; the client's adaptive retry mode handles throttling."""
+        return ''.join(self._invoke_stream(prompt, system))
+    
+    async def _ainvoke(self, prompt: str, system: Optional[str] = None, max_tokens: Optional[int] = None) -> str:
+        """Invoke once asynchronously; the client's adaptive retry mode handles throttling."""
+        return await self._raw_ainvoke(prompt, system, max_tokens)
+    
     def get_total_cost(self) -> float:
         """Get the total cost of all invocations."""
         return self.total_cost
@@ -212,12 +704,9 @@ class LLMProvider:
     @staticmethod
     def create_llm(config: LLMConfig) -> BaseLLM:
         """Create an LLM instance based on the model name."""
-        bedrock_models = {"claude", "claude-haiku"}
-        ollama_models = {"llama3.2", "mistral"}
-        
-        if config.model in bedrock_models:
+        if config.model in _BEDROCK_MODELS:
             return BedrockWrapper(config)
-        elif config.model in ollama_models or config.model.startswith("llama"):
+        elif config.model in _OLLAMA_MODELS or config.model.startswith("llama"):
             return OllamaWrapper(config)
         else:
             # Default to Ollama for unknown models
@@ -10,26 +10,45 @@ You may obtain a copy of the License at
 """
 
 import os
+import sys
 import argparse
+from functools import lru_cache
+from typing import Optional
+import asyncio
 from dotenv import load_dotenv
 from youtube_handler import YoutubeHandler
-from transcript_processor import TranscriptProcessor
-from markdown_generator import MarkdownGenerator
 from utils import (
     TimingStats, 
     create_progress, 
     measure_time, 
+    ameasure_time,
     save_markdown, 
+    save_transcripts,
     print_configuration,
     SystemInfo,
     console
 )
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
-def parse_arguments() -> argparse.Namespace:
-    """Parse command line arguments."""
-    # Load environment variables first
+# Persistent cache of LLM categories and summaries, reused across runs
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'yt_playlist_summary', 'llm_cache.db')
+# Persistent cache of downloaded transcripts, reused across runs
+DEFAULT_TRANSCRIPT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'yt_playlist_summary', 'transcripts.pkl')
+
+# Most transcript downloads in flight at once, however large the batch size
+MAX_DOWNLOAD_WORKERS = 32
+
+# Environment values that switch a boolean option on
+_TRUE_VALUES = frozenset({'true', '1', 'yes', 'on'})
+
+def _parse_bool(value: str) -> bool:
+    """Interpret an environment variable value as a boolean."""
+    return value.strip().lower() in _TRUE_VALUES
+
+@lru_cache(maxsize=1)
+def _load_env_once() -> None:
+    """Load the project .env file into the environment, once per process."""
     # Add debug information for .env loading
     env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
     if os.path.exists(env_path):
@@ -37,7 +56,9 @@ def parse_arguments() -> argparse.Namespace:
         console.log(f"[cyan]Loading environment from: {env_path}[/cyan]")
     else:
         console.log("[yellow]Warning: .env file not found[/yellow]")
-    
+
+def _env_defaults() -> dict:
+    """Read argument defaults from the environment and the detected hardware."""
     # Get playlist URL from environment
     env_playlist_url = os.getenv('PLAYLIST_URL') or None  # Convert empty string to None
     if env_playlist_url:
@@ -45,61 +66,91 @@ def parse_arguments() -> argparse.Namespace:
     else:
         console.log("[yellow]No playlist URL found in environment[/yellow]")
     
+    env_verbose = _parse_bool(os.getenv('VERBOSE', ''))
+    
     # Get system information
-    system_settings = SystemInfo.get_optimal_settings(
-        verbose=os.getenv('VERBOSE', '').lower() in ('true', '1', 'yes')
-    )
+    system_settings = SystemInfo.get_optimal_settings(verbose=env_verbose)
     
     # Get environment variables with defaults
     env_videos = os.getenv('VIDEOS', '')  # Empty string as default
-    env_categories = os.getenv('CATEGORIES')
-    env_batch_size = os.getenv('BATCH_SIZE', '1')
-    env_num_gpus = os.getenv('NUM_GPUS', str(system_settings['num_gpus']))
-    env_num_cpus = os.getenv('NUM_CPUS', str(system_settings['num_cpus']))
-    env_model = os.getenv('MODEL', 'llama3.2')
-    env_threads = os.getenv('THREADS', str(system_settings['num_threads']))
-    env_output = os.getenv('OUTPUT')
-    env_verbose = os.getenv('VERBOSE', '').lower() in ('true', '1', 'yes')
-    
-    parser = argparse.ArgumentParser(description='Analyze YouTube playlist')
+    return {
+        'playlist_url': env_playlist_url,
+        'videos': int(env_videos) if env_videos.isdigit() else None,
+        'categories': os.getenv('CATEGORIES'),
+        'batch_size': int(os.getenv('BATCH_SIZE', '1')),
+        'videos_per_call': int(os.getenv('VIDEOS_PER_CALL', '1')),
+        'num_gpus': int(os.getenv('NUM_GPUS', str(system_settings['num_gpus']))),
+        'num_cpus': int(os.getenv('NUM_CPUS', str(system_settings['num_cpus']))),
+        'model': os.getenv('MODEL', 'llama3.2'),
+        'threads': int(os.getenv('THREADS', str(system_settings['num_threads']))),
+        'output': os.getenv('OUTPUT'),
+        'verbose': env_verbose,
+    }
+
+class _EnvDefaultsParser(argparse.ArgumentParser):
+    """Argument parser that re-reads its defaults from the environment on every parse."""
+    def parse_known_args(self, args=None, namespace=None):
+        self.set_defaults(**_env_defaults())
+        return super().parse_known_args(args, namespace)
+
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser once; defaults are filled in at parse time."""
+    parser = _EnvDefaultsParser(description='Analyze YouTube playlist')
     parser.add_argument('--playlist-url', type=str, 
-        help='YouTube playlist URL (overrides environment variable)',
-        default=env_playlist_url)
+        help='YouTube playlist URL (overrides environment variable)')
     parser.add_argument('--videos', type=int, 
-        help='Number of videos to process (default: all)', 
-        default=int(env_videos) if env_videos.isdigit() else None)
+        help='Number of videos to process (default: all)')
     parser.add_argument('--categories', type=str,
-        help='Comma-separated list of categories to include',
-        default=env_categories)
+        help='Comma-separated list of categories to include')
     parser.add_argument('--batch-size', type=int,
-        help='Number of videos to process concurrently (default: 1)',
-        default=int(env_batch_size))
+        help='Number of videos to process concurrently (default: 1)')
+    parser.add_argument('--videos-per-call', type=int,
+        help='Number of videos categorized and summarized per LLM call (default: 1)')
     parser.add_argument('--num-gpus', type=int,
-        help='Number of GPUs to use (default: 0)',
-        default=int(env_num_gpus))
+        help='Number of GPUs to use (default: 0)')
     parser.add_argument('--num-cpus', type=int,
-        help='Number of CPU cores to use (default: 4)',
-        default=int(env_num_cpus))
+        help='Number of CPU cores to use (default: 4)')
     parser.add_argument('-o', '--output', type=str,
-        help='Output file path (default: auto-generated in output/)',
-        default=env_output)
+        help='Output file path (default: auto-generated in output/)')
     parser.add_argument('--model', type=str,
-        help='Ollama model to use (default: llama3.2)',
-        default=env_model)
+        help='Ollama model to use (default: llama3.2)')
     parser.add_argument('--threads', type=int,
-        help='Number of CPU threads for LLM (default: 4)',
-        default=int(env_threads))
+        help='Number of CPU threads for LLM (default: 4)')
     parser.add_argument('--verbose', action='store_true',
-        help='Show detailed progress information',
-        default=env_verbose)
-    args = parser.parse_args()
+        help='Show detailed progress information')
+    parser.add_argument('--extract-transcripts', action='store_true',
+        help='Only download the transcripts and save them as JSON, without using the LLM',
+        default=False)
+    parser.add_argument('--no-cache', action='store_true',
+        help='Do not reuse or store cached transcripts, categories and summaries',
+        default=False)
+    return parser
+
+@lru_cache(maxsize=8)
+def _parse_arguments_cached(argv: tuple, env: frozenset) -> argparse.Namespace:
+    """Parse `argv`; `env` is the environment snapshot the result depends on."""
+    return _build_parser().parse_args(list(argv))
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    # Load environment variables first
+    _load_env_once()
+    args = _parse_arguments_cached(tuple(sys.argv[1:]), frozenset(os.environ.items()))
+    # Callers may change the namespace, so never hand out the cached instance
+    args = argparse.Namespace(**vars(args))
     
     # If playlist_url is not provided in command line, use environment variable
     if not args.playlist_url:
-        args.playlist_url = env_playlist_url
+        args.playlist_url = os.getenv('PLAYLIST_URL') or None
     
     return args
 
+def clear_argument_cache() -> None:
+    """Forget cached arguments and the .env load, e.g. between tests."""
+    _parse_arguments_cached.cache_clear()
+    _load_env_once.cache_clear()
+
 def get_playlist_url(args) -> str:
     """Get playlist URL from arguments or environment."""
     if not args.playlist_url:
@@ -108,117 +159,287 @@ def get_playlist_url(args) -> str:
     
     return args.playlist_url
 
-def process_video(video, youtube_handler, transcript_processor, progress=None, verbose=False, timing_stats=None) -> dict:
-    """Process a single video and return result."""
-    # Create formatted title
-    video_title = f"[green]{video['title']}[/green]"
+def extract_transcripts(videos, youtube_handler, max_workers=MAX_DOWNLOAD_WORKERS, timing_stats=None) -> dict:
+    """Download transcripts for all videos concurrently, keyed by video ID in playlist order."""
+    with create_progress() as progress:
+        task = progress.add_task(
+            description=f"[yellow]Downloading {len(videos)} transcripts",
+            total=len(videos)
+        )
+        # Downloads are pure network I/O, so use more workers than LLM batches would
+        transcripts = measure_time(
+            "Transcript Batch Download",
+            youtube_handler.get_transcripts_batch,
+            timing_stats,
+            [video['video_id'] for video in videos],
+            max_workers,
+            lambda video_id, transcript: progress.update(task, advance=1),
+            timing_stats
+        )
     
-    # Get task IDs from progress context
-    tasks = progress.task_ids if progress else []
-    overall_task = tasks[0] if tasks else None
+    return {
+        video['video_id']: {
+            'title': video['title'],
+            'url': video['url'],
+            'transcript': transcripts[video['video_id']]
+        }
+        for video in videos
+    }
+
+class _VideoProgress:
+    """Progress bar updates and log lines for one video, which all advance its task by 1 in total."""
     
-    if progress and verbose:
-        progress.log(f"[bold white]Processing:[/bold white] {video_title}")
+    def __init__(self, video, progress=None, verbose=False):
+        self.progress = progress
+        self.verbose = verbose
+        self.title = video['title']
+        # Create formatted title
+        self.video_title = f"[green]{video['title']}[/green]"
+        # Get task IDs from progress context
+        tasks = progress.task_ids if progress else []
+        self.overall_task = tasks[0] if tasks else None
+        self.done = 0.0
     
-    if progress:
-        progress.update(overall_task, advance=0.25, description=f"[yellow]Downloading transcript for: {video['title']}")
+    def log(self, message: str) -> None:
+        if self.progress and self.verbose:
+            self.progress.log(message)
     
-    # Get transcript with status
-    transcript = measure_time("Transcript Download", youtube_handler.get_transcript, timing_stats, video['video_id'])
+    def advance(self, amount: float, description: Optional[str] = None) -> None:
+        if self.progress:
+            if description is None:
+                self.progress.update(self.overall_task, advance=amount)
+            else:
+                self.progress.update(self.overall_task, advance=amount, description=description)
+        self.done += amount
     
-    if not transcript:
-        if progress and verbose:
-            progress.log(f"[yellow]Skipping:[/yellow] {video_title} [dim](No transcript available)[/dim]")
-        if progress:
-            progress.update(overall_task, advance=0.75)  # Complete remaining progress for skipped video
-        return None
+    def finish(self) -> None:
+        """Complete whatever progress remains, however far the video got."""
+        self.advance(1.0 - self.done)
     
-    try:
-        # First get and check category
-        if progress and verbose:
-            progress.log(f"[bold white]Categorizing:[/bold white] {video_title}")
-        if progress:
-            progress.update(overall_task, advance=0.25, description=f"[yellow]Categorizing: {video['title']}")
-        
-        category = measure_time("Category Generation", transcript_processor.get_category, timing_stats, video['title'], transcript)
-        
-        # Check if category matches filter
+    def downloading(self) -> None:
+        self.log(f"[bold white]Processing:[/bold white] {self.video_title}")
+        self.advance(0.25, f"[yellow]Downloading transcript for: {self.title}")
+    
+    def skipped(self, reason: str) -> None:
+        self.log(f"[yellow]Skipping:[/yellow] {self.video_title} [dim]({reason})[/dim]")
+        self.finish()
+    
+    def categorizing(self) -> None:
+        self.log(f"[bold white]Categorizing and summarizing:[/bold white] {self.video_title}")
+        self.advance(0.5, f"[yellow]Categorizing and summarizing: {self.title}")
+    
+    def failed(self, error: Exception) -> None:
+        self.log(f"[red]Error processing[/red] {self.video_title}: [dim]{str(error)}[/dim]")
+        self.finish()
+    
+    def categorized(self, transcript_processor, category: str, summary: str):
+        """Return the video's result, or None when its category is not in the filter."""
         if not transcript_processor.matches_filter(category):
-            if progress and verbose:
-                progress.log(f"[yellow]Skipping:[/yellow] {video_title} [dim](Category '{category}' not in filter)[/dim]")
-            if progress:
-                progress.update(overall_task, advance=0.5)  # Complete remaining progress for filtered video
+            self.skipped(f"Category '{category}' not in filter")
             return None
-        
-        # If category matches, get summary
-        if progress and verbose:
-            progress.log(f"[bold white]Generating summary for:[/bold white] {video_title}")
-        if progress:
-            progress.update(overall_task, advance=0.25, description=f"[yellow]Generating summary for: {video['title']}")
-        
-        summary = measure_time("Summary Generation", transcript_processor.get_summary, timing_stats, video['title'], transcript)
-        
-        # Return combined results
-        result = {
+        self.log(f"[green]Completed:[/green] {self.video_title}")
+        self.advance(1.0 - self.done, "[yellow]Processing videos...")
+        return {
             "category": category,
             "summary": summary
         }
+
+def process_video(video, youtube_handler, transcript_processor, progress=None, verbose=False, timing_stats=None) -> dict:
+    """Process a single video and return result."""
+    report = _VideoProgress(video, progress, verbose)
+    report.downloading()
+    transcript = measure_time("Transcript Download", youtube_handler.get_transcript, timing_stats, video['video_id'])
+    if not transcript:
+        report.skipped("No transcript available")
+        return None
+    
+    try:
+        # With a category filter, cheaply discard videos that clearly do not match
+        if transcript_processor.filter_categories and not measure_time(
+            "Category Gate", transcript_processor.quick_gate, timing_stats, video['title'], transcript
+        ):
+            report.skipped("Not in category filter")
+            return None
         
-        if progress and verbose:
-            progress.log(f"[green]Completed:[/green] {video_title}")
-        if progress:
-            progress.update(overall_task, advance=0.25, description="[yellow]Processing videos...")
-        
-        return result
-        
+        # Get category and summary with a single LLM call
+        report.categorizing()
+        category, summary = measure_time(
+            "Category+Summary", transcript_processor.get_category_and_summary, timing_stats, video['title'], transcript
+        )
+        return report.categorized(transcript_processor, category, summary)
     except Exception as e:
-        if progress and verbose:
-            progress.log(f"[red]Error processing[/red] {video_title}: [dim]{str(e)}[/dim]")
-        if progress:
-            progress.update(overall_task, advance=1.0)  # Complete progress for errored video
+        report.failed(e)
         return None
 
-def process_video_batch(videos, youtube_handler, transcript_processor, markdown_generator, batch_size=1, progress=None, overall_task=None, timing_stats=None):
-    """Process a batch of videos concurrently."""
-    with ThreadPoolExecutor(max_workers=batch_size) as executor:
-        # Submit all tasks
-        future_to_video = {
-            executor.submit(
-                process_video,
-                video,
-                youtube_handler,
-                transcript_processor,
-                progress,
-                True if timing_stats else False,  # verbose mode
-                timing_stats
-            ): video for video in videos
-        }
+async def _aprocess_video(video, youtube_handler, transcript_processor, semaphore, progress=None, verbose=False, timing_stats=None, executor=None) -> dict:
+    """Asynchronous `process_video`, handling at most as many videos at once as `semaphore` allows."""
+    async with semaphore:
+        report = _VideoProgress(video, progress, verbose)
+        report.downloading()
+        # The transcript API is synchronous, so download on a worker thread
+        transcript = await asyncio.get_running_loop().run_in_executor(
+            executor, measure_time, "Transcript Download", youtube_handler.get_transcript, timing_stats, video['video_id']
+        )
+        if not transcript:
+            report.skipped("No transcript available")
+            return None
         
-        # Process completed tasks as they finish
-        for future in as_completed(future_to_video):
-            # Process result if valid
-            result = future.result()
-            if result:
+        try:
+            if transcript_processor.filter_categories and not await ameasure_time(
+                "Category Gate", transcript_processor.aquick_gate, timing_stats, video['title'], transcript
+            ):
+                report.skipped("Not in category filter")
+                return None
+            
+            report.categorizing()
+            category, summary = await ameasure_time(
+                "Category+Summary", transcript_processor.aget_category_and_summary, timing_stats, video['title'], transcript
+            )
+            return report.categorized(transcript_processor, category, summary)
+        except Exception as e:
+            report.failed(e)
+            return None
+
+async def _aprocess_video_batch(videos, youtube_handler, transcript_processor, markdown_generator, batch_size=1, progress=None, timing_stats=None, executor=None):
+    """Process a batch of videos concurrently on the event loop, adding results in playlist order."""
+    semaphore = asyncio.Semaphore(batch_size)
+    
+    async def process(video):
+        result = await _aprocess_video(
+            video,
+            youtube_handler,
+            transcript_processor,
+            semaphore,
+            progress,
+            True if timing_stats else False,  # verbose mode
+            timing_stats,
+            executor
+        )
+        return video, result
+    
+    for video, result in await asyncio.gather(*(process(video) for video in videos)):
+        if result:
+            markdown_generator.add_video(
+                result['category'],
+                video,
+                result['summary']
+            )
+
+def process_grouped_video_batch(videos, youtube_handler, transcript_processor, markdown_generator, executor, progress=None, overall_task=None, timing_stats=None):
+    """Process a batch of videos, sending several transcripts per LLM call."""
+    def download(video):
+        transcript = measure_time("Transcript Download", youtube_handler.get_transcript, timing_stats, video['video_id'])
+        if progress:
+            # Videos without transcript are complete once the download fails
+            progress.update(overall_task, advance=0.25 if transcript else 1.0)
+        return transcript
+    
+    def process_group(group):
+        items = [(video['title'], transcript) for video, transcript in group]
+        results = measure_time("Batch Category+Summary", transcript_processor.get_batch, timing_stats, items)
+        if progress:
+            progress.update(overall_task, advance=0.75 * len(group))
+        return results
+    
+    videos_per_call = transcript_processor.videos_per_call
+    transcripts = list(executor.map(download, videos))
+    available = [(video, transcript) for video, transcript in zip(videos, transcripts) if transcript]
+    groups = [available[i:i + videos_per_call] for i in range(0, len(available), videos_per_call)]
+    
+    for group, results in zip(groups, executor.map(process_group, groups)):
+        for (video, _), result in zip(group, results):
+            if result and transcript_processor.matches_filter(result['category']):
                 markdown_generator.add_video(
                     result['category'],
-                    future_to_video[future],
+                    video,
                     result['summary']
                 )
 
-def process_playlist(videos, youtube_handler, transcript_processor, markdown_generator, verbose=False, timing_stats=None):
+def process_video_batch(videos, youtube_handler, transcript_processor, markdown_generator, batch_size=1, progress=None, overall_task=None, timing_stats=None, use_async=True, executor=None):
+    """Process a batch of videos concurrently, on `executor` if given or on a pool of `batch_size` threads."""
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=batch_size) as executor:
+            process_video_batch(
+                videos,
+                youtube_handler,
+                transcript_processor,
+                markdown_generator,
+                batch_size,
+                progress,
+                overall_task,
+                timing_stats,
+                use_async,
+                executor
+            )
+        return
+    
+    if transcript_processor.videos_per_call > 1:
+        process_grouped_video_batch(
+            videos,
+            youtube_handler,
+            transcript_processor,
+            markdown_generator,
+            executor,
+            progress,
+            overall_task,
+            timing_stats
+        )
+        return
+    
+    if use_async:
+        asyncio.run(_aprocess_video_batch(
+            videos,
+            youtube_handler,
+            transcript_processor,
+            markdown_generator,
+            batch_size,
+            progress,
+            timing_stats,
+            executor
+        ))
+        return
+    
+    # Submit all tasks
+    futures = [
+        executor.submit(
+            process_video,
+            video,
+            youtube_handler,
+            transcript_processor,
+            progress,
+            True if timing_stats else False,  # verbose mode
+            timing_stats
+        ) for video in videos
+    ]
+    
+    # Add results in playlist order, so the output does not depend on timing
+    for video, future in zip(videos, futures):
+        # Process result if valid
+        result = future.result()
+        if result:
+            markdown_generator.add_video(
+                result['category'],
+                video,
+                result['summary']
+            )
+
+def process_playlist(videos, youtube_handler, transcript_processor, markdown_generator, verbose=False, timing_stats=None, use_async=True):
     """Process all videos in the playlist."""
     batch_size = transcript_processor.batch_size
+    # Each concurrent worker handles videos_per_call videos per LLM call
+    videos_per_batch = batch_size * transcript_processor.videos_per_call
     total_videos = len(videos)
     
-    with create_progress() as progress:
+    # One pool for the whole playlist, so worker threads are not recreated per batch
+    with create_progress() as progress, ThreadPoolExecutor(max_workers=batch_size) as executor:
         # Create tasks for each phase
         overall_task = progress.add_task(
             description=f"[yellow]Processing {total_videos} videos",
             total=total_videos
         )
         
-        for i in range(0, len(videos), batch_size):
-            batch = videos[i:i + batch_size]
+        for i in range(0, len(videos), videos_per_batch):
+            batch = videos[i:i + videos_per_batch]
             
             if verbose:
                 task = progress.tasks[overall_task]
@@ -235,7 +456,9 @@ def process_playlist(videos, youtube_handler, transcript_processor, markdown_gen
                 batch_size,
                 progress,
                 overall_task,
-                timing_stats
+                timing_stats,
+                use_async,
+                executor
             )
 
 def main():
@@ -250,10 +473,38 @@ def main():
     print_configuration(args, playlist_url)
     
     # Setup components
-    youtube_handler = YoutubeHandler(verbose=args.verbose)
+    youtube_handler = YoutubeHandler(
+        verbose=args.verbose,
+        cache_path=None if args.no_cache else DEFAULT_TRANSCRIPT_CACHE_PATH
+    )
     
-    # Get playlist information
-    videos, playlist_title = youtube_handler.get_playlist_videos(playlist_url)
+    # Get playlist information; the handler only needs yt-dlp for this call
+    try:
+        videos, playlist_title = youtube_handler.get_playlist_videos(playlist_url)
+    finally:
+        youtube_handler.close()
+    
+    # Limit videos if specified
+    if args.videos is not None:
+        videos = videos[:args.videos]
+        print(f"\nProcessing first {args.videos} video(s) from playlist")
+    else:
+        print(f"\nProcessing all {len(videos)} videos from playlist")
+    
+    # Only download transcripts if requested, skipping the LLM entirely
+    if args.extract_transcripts:
+        transcripts = extract_transcripts(
+            videos, youtube_handler, min(args.batch_size * 4, MAX_DOWNLOAD_WORKERS), timing_stats
+        )
+        output_filename = save_transcripts(transcripts, playlist_title, args.videos, args.output)
+        print(f"\nTranscripts saved to: {output_filename}")
+        if timing_stats:
+            timing_stats.print_stats()
+        return
+    
+    # Imported here so --extract-transcripts runs never load the LLM stack
+    from transcript_processor import TranscriptProcessor
+    from markdown_generator import MarkdownGenerator
     
     # Set category filter if provided
     try:
@@ -262,7 +513,9 @@ def main():
             num_gpus=args.num_gpus,
             num_cpus=args.num_cpus,
             model=args.model,
-            num_threads=args.threads
+            num_threads=args.threads,
+            videos_per_call=args.videos_per_call,
+            cache_path=None if args.no_cache else DEFAULT_CACHE_PATH
         )
         transcript_processor.set_filter_categories(args.categories)
         if args.categories:
@@ -274,15 +527,11 @@ def main():
     # Initialize markdown generator with playlist title
     markdown_generator = MarkdownGenerator(playlist_title)
     
-    # Limit videos if specified
-    if args.videos is not None:
-        videos = videos[:args.videos]
-        print(f"\nProcessing first {args.videos} video(s) from playlist")
-    else:
-        print(f"\nProcessing all {len(videos)} videos from playlist")
-    
-    # Process videos
-    process_playlist(videos, youtube_handler, transcript_processor, markdown_generator, args.verbose, timing_stats)
+    # Process videos, flushing cached results even if processing is interrupted
+    try:
+        process_playlist(videos, youtube_handler, transcript_processor, markdown_generator, args.verbose, timing_stats)
+    finally:
+        transcript_processor.close()
     
     # Check if any videos were processed
     if not markdown_generator.categories:
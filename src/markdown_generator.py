@@ -9,76 +9,102 @@ You may obtain a copy of the License at
     https://opensource.org/licenses/MIT
 """
 
-import json
-from typing import Dict, List, Any
-from collections import defaultdict
+from __future__ import annotations
+
+import io
+import re
+from dataclasses import dataclass
+from typing import Dict, List
+
+__all__ = ["MarkdownGenerator", "VideoEntry"]
+
+_VIDEO_ID_RE = re.compile(r'[?&]v=([A-Za-z0-9_-]{6,})')
+
+@dataclass(slots=True)
+class VideoEntry:
+    """A video listed in the generated markdown."""
+    title: str
+    url: str
+    thumbnail: str
+    summary: str
+    speaker: str = 'N/A'
 
 class MarkdownGenerator:
     def __init__(self, playlist_title: str):
         self.playlist_title = playlist_title
-        self.content = []
         self.toc_anchor = "table-of-contents"
-        self.categories: Dict[str, List[Dict[str, Any]]] = {}
+        self.categories: Dict[str, List[VideoEntry]] = {}
+        # HTML anchor per category, computed when the category is first added
+        self._anchors: Dict[str, str] = {}
     
     def _extract_video_id(self, url: str) -> str:
         """Extract video ID from YouTube URL."""
-        if 'v=' in url:
-            return url.split('v=')[1].split('&')[0]
-        return ''
+        match = _VIDEO_ID_RE.search(url)
+        return match.group(1) if match else ''
     
     def add_video(self, category: str, video_info: dict, summary: str):
         """Add a video to a category."""
         if category not in self.categories:
             self.categories[category] = []
+            self._anchors[category] = category.replace(" ", "-").lower()
         
         video_id = self._extract_video_id(video_info['url'])
         thumbnail_url = f"https://img.youtube.com/vi/{video_id}/0.jpg"
         
-        self.categories[category].append({
-            'title': video_info['title'],
-            'url': video_info['url'],
-            'thumbnail': thumbnail_url,
-            'summary': summary,
-            'speaker': video_info.get('speaker', 'N/A')
-        })
+        self.categories[category].append(VideoEntry(
+            title=video_info['title'],
+            url=video_info['url'],
+            thumbnail=thumbnail_url,
+            summary=summary,
+            speaker=video_info.get('speaker', 'N/A')
+        ))
     
-    def _format_video_entry(self, video: Dict[str, Any]) -> str:
-        """Format a single video entry with thumbnail and summary."""
-        return f"""
-<table style='border: none; border-collapse: collapse; width: 100%;'><tr style='border: none;'>
-<td width='30%' style='border: none;'><a href='{video['url']}'><img src='{video['thumbnail']}' width='200'></a></td>
-<td valign='top' style='border: none;'>
-<h3><a href='{video['url']}'>{video['title']}</a></h3>
-{video['summary']}
-<div style='text-align: right; font-size: 0.8em;'><a href='#{self.toc_anchor}'>back to top</a></div>
-</td>
-</tr></table>"""
+    def _write_video_entry(self, buf: io.StringIO, video: VideoEntry) -> None:
+        """Write a single video entry with thumbnail and summary."""
+        url = video.url
+        buf.write("\n<table style='border: none; border-collapse: collapse; width: 100%;'><tr style='border: none;'>\n"
+                  "<td width='30%' style='border: none;'><a href='")
+        buf.write(url)
+        buf.write("'><img src='")
+        buf.write(video.thumbnail)
+        buf.write("' width='200'></a></td>\n<td valign='top' style='border: none;'>\n<h3><a href='")
+        buf.write(url)
+        buf.write("'>")
+        buf.write(video.title)
+        buf.write("</a></h3>\n")
+        buf.write(video.summary)
+        buf.write("\n<div style='text-align: right; font-size: 0.8em;'><a href='#")
+        buf.write(self.toc_anchor)
+        buf.write("'>back to top</a></div>\n</td>\n</tr></table>")
 
     def generate_markdown(self) -> str:
         """Generate markdown content with table of contents and categorized videos."""
+        buf = io.StringIO()
+        
         # Start with title and TOC
-        self.content = [
-            f"# {self.playlist_title}\n",
-            f"<h2 id='{self.toc_anchor}'>Table of Contents</h2>\n"
+        buf.write(f"# {self.playlist_title}\n\n<h2 id='{self.toc_anchor}'>Table of Contents</h2>\n")
+        
+        # Only categories with videos are listed, each with its anchor
+        entries = [
+            (category, self._anchors[category], videos)
+            for category, videos in sorted(self.categories.items())
+            if videos
         ]
         
         # Add categories to TOC
-        for category in sorted(self.categories.keys()):
-            if self.categories[category]:  # Only add categories with videos
-                safe_category = category.replace(" ", "-").lower()
-                self.content.append(f"- [{category}](#{safe_category}) ({len(self.categories[category])} videos)")
+        for category, safe_category, videos in entries:
+            buf.write(f"\n- [{category}](#{safe_category}) ({len(videos)} videos)")
         
-        self.content.append("\n")  # Add spacing after TOC
+        buf.write("\n\n")  # Add spacing after TOC
         
         # Add categorized content
-        for category in sorted(self.categories.keys()):
-            if self.categories[category]:  # Only add categories with videos
-                safe_category = category.replace(" ", "-").lower()
-                # Use HTML for category headers with hidden anchors
-                self.content.append(f"\n<h2 id='{safe_category}'>{category}</h2>\n")
-                
-                # Add each video in the category
-                for video in self.categories[category]:
-                    self.content.append(self._format_video_entry(video))
+        for category, safe_category, videos in entries:
+            # Use HTML for category headers with hidden anchors
+            buf.write(f"\n\n<h2 id='{safe_category}'>{category}</h2>\n")
+            
+            # Add each video in the category
+            for video in videos:
+                buf.write("\n")
+                self._write_video_entry(buf, video)
         
-        return "\n".join(self.content) 
\ No newline at end of file
+        return buf.getvalue()
@@ -9,13 +9,65 @@ You may obtain a copy of the License at
     https://opensource.org/licenses/MIT
 """
 
-from typing import Optional, Set, Dict, Any
-from collections.abc import Callable
-from pydantic import BaseModel, Field
-from langchain_ollama import OllamaLLM
-from langchain.prompts import PromptTemplate
-import json
-from llm_provider import LLMConfig, LLMProvider, RetryConfig
+from __future__ import annotations
+
+from typing import Optional, Set, Dict, Any, Tuple, List, TYPE_CHECKING
+import re
+import os
+import shelve
+import hashlib
+import importlib
+import threading
+import orjson
+
+if TYPE_CHECKING:
+    from langchain.prompts import PromptTemplate
+
+# LangChain and the LLM clients are slow to import, so they are only loaded
+# once a TranscriptProcessor is created; these names stay importable from here
+_LAZY_IMPORTS = {
+    "PromptTemplate": "langchain.prompts",
+    "LLMConfig": "llm_provider",
+    "LLMProvider": "llm_provider",
+    "RetryConfig": "llm_provider",
+}
+
+def __getattr__(name: str) -> Any:
+    """Resolve the lazily imported names on first access."""
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Words per chunk when an unpunctuated (auto-generated) transcript is condensed
+_CONDENSE_WINDOW_WORDS = 40
+
+# Transcript characters shown to the quick category filter gate
+_GATE_SNIPPET_CHARS = 800
+
+# Context windows, in tokens, of the Bedrock models; Ollama models get the
+# window requested from the server through LLMConfig.num_ctx
+_MODEL_CONTEXT_TOKENS = {"claude": 200000, "claude-haiku": 200000, "nova": 300000}
+
+# Tokens kept free for the instructions, the category menu and the response
+_RESERVED_PROMPT_TOKENS = 2048
+
+# Generation caps for the short JSON answers of the category and gate prompts
+_CATEGORY_MAX_TOKENS = 32
+_GATE_MAX_TOKENS = 16
+
+# Placeholders used to pre-render the text around a prompt's per-video fields
+_TITLE_MARK = "\x00title\x00"
+_TRANSCRIPT_MARK = "\x00transcript\x00"
+
+def _split_prompt(template: PromptTemplate) -> Tuple[str, str, str]:
+    """Pre-render a (title, transcript) template into the fixed text around both fields."""
+    rendered = template.format(title=_TITLE_MARK, transcript=_TRANSCRIPT_MARK)
+    prefix, rest = rendered.split(_TITLE_MARK)
+    middle, suffix = rest.split(_TRANSCRIPT_MARK)
+    return prefix, middle, suffix
 
 class TranscriptProcessor:
     def __init__(
@@ -24,12 +76,18 @@ class TranscriptProcessor:
         num_gpus: int = 0, 
         num_cpus: int = 4, 
         model: str = 'llama3.2', 
-        num_threads: int = 4
+        num_threads: int = 4,
+        max_context_chars: Optional[int] = 4000,
+        videos_per_call: int = 1,
+        cache_path: Optional[str] = None
     ) -> None:
-        # Configure LLM settings
+        from langchain.prompts import PromptTemplate
+        from llm_provider import LLMConfig, LLMProvider, RetryConfig
+        
+        # Configure LLM settings; the CPU core count takes precedence over threads if specified
         llm_config = LLMConfig(
             model=model,
-            num_thread=num_threads,
+            num_thread=num_cpus if num_cpus > 0 else num_threads,
             num_gpu=num_gpus,
             retry=RetryConfig()  # Add retry configuration
         )
@@ -37,37 +95,50 @@ class TranscriptProcessor:
         # Store model name for testing
         self.model_name: str = model
         
-        # Add GPU configuration if specified
-        if num_gpus > 0:
-            llm_config.num_gpu = num_gpus
-        
-        # Add CPU configuration if specified
-        if num_cpus > 0:
-            llm_config.num_thread = num_cpus
+        # Transcripts are condensed further if the prompt would not fit the context window
+        self.max_ctx_tokens: int = _MODEL_CONTEXT_TOKENS.get(model, llm_config.num_ctx)
         
         # Create LLM instance using provider
         self.llm = LLMProvider.create_llm(llm_config)
         
         self.batch_size: int = max(1, batch_size)
         
+        # Transcripts longer than this are condensed before prompting (None disables it)
+        self.max_context_chars: Optional[int] = max_context_chars
+        
+        # Number of videos categorized and summarized together in one LLM call
+        self.videos_per_call: int = max(1, videos_per_call)
+        
         # Define valid categories
-
-
         self.valid_categories: Set[str] = {
             "Keynote", "Security", "GitOps", "AI & ML", "Sustainability",
             "Scaling", "Scheduling", "Performance Engineering", "Observability", 
-            "Analytics", "Databases", "Operations"
+            "Analytics", "Databases", "Operations",
             "HPC", "Developer Experience", "Compute",
             "Storage", "Networking", "Serverless","Architecture"           
         }
+        
+        # Precomputed lookups, so matching an LLM response does not rescan the categories
+        self._normalized_valid: Dict[str, str] = {
+            self._normalize_category(cat): cat for cat in self.valid_categories
+        }
+        
+        # The LLM picks a category by its index in this numbered menu, which is
+        # shorter to generate than the name and cannot be misspelled
+        self._category_list: List[str] = sorted(self.valid_categories) + ["Uncategorized"]
+        self._category_menu: str = "\n".join(
+            f"{index}: {category}" for index, category in enumerate(self._category_list)
+        )
+        self._preselected_str: Optional[str] = None
 
         self.filter_categories: Optional[Set[str]] = None
         
         # Add preselected categories storage
         self.preselected_categories: Set[str] = set()
         
-        # Prompt template for categorization
-        self.category_prompt = PromptTemplate(
+        # Prompt templates for categorization. The instructions are sent as a
+        # system prompt so providers with prompt caching can reuse them across videos.
+        self.category_system_prompt = PromptTemplate(
             template="""Based on the following video title and transcript, 
             choose the most appropriate category. Please do not make the category
             too specific, it should be a broad category. 
@@ -76,28 +147,146 @@ class TranscriptProcessor:
             If the content is similar to any of the previously used categories, 
             please reuse that category for better grouping.
             
-            If no previous categories match, you can choose from these examples: {categories}
-            
-            Title: {title}
+            Choose the category by its number from this list:
+            {categories}""",
+            input_variables=["preselected_categories", "categories"]
+        )
+        self.category_prompt = PromptTemplate(
+            template="""Title: {title}
             Transcript: {transcript}
             
             Respond ONLY with a JSON object in this format:
-            {{"category": "chosen_category"}}""",
-            input_variables=["preselected_categories", "categories", "title", "transcript"]
+            {{"category_index": chosen_category_number}}""",
+            input_variables=["title", "transcript"]
         )
         
-        # Prompt template for summarization
+        # Prompt templates for summarization
+        self.summary_system_prompt = """Provide a concise one paragraph with 3 sentences at least. Use an abstract style as the
+            one you would propose for a conference talk with the summary of this video content."""
         self.summary_prompt = PromptTemplate(
-            template="""Provide a concise one paragraph with 3 sentences at least. Use an abstract style as the
-            one you would propose for a conference talk with the summary of this video content.
-            
-            Title: {title}
+            template="""Title: {title}
             Transcript: {transcript}
             
             Respond ONLY with a JSON object in this format:
             {{"summary": "your_two_sentence_summary"}}""",
             input_variables=["title", "transcript"]
         )
+        
+        # Prompt templates for categorizing and summarizing in a single call
+        self.combined_system_prompt = PromptTemplate(
+            template="""Based on the following video title and transcript, 
+            choose the most appropriate category and write a summary.
+            
+            For the category, please do not make it too specific, it should be a broad category.
+            Previously used categories: {preselected_categories}
+            If the content is similar to any of the previously used categories, 
+            please reuse that category for better grouping.
+            Choose the category by its number from this list:
+            {categories}
+            
+            For the summary, provide a concise one paragraph with 3 sentences at least. Use an abstract
+            style as the one you would propose for a conference talk with the summary of this video content.""",
+            input_variables=["preselected_categories", "categories"]
+        )
+        self.combined_prompt = PromptTemplate(
+            template="""Title: {title}
+            Transcript: {transcript}
+            
+            Respond ONLY with a JSON object in this format:
+            {{"category_index": chosen_category_number, "summary": "your_summary"}}""",
+            input_variables=["title", "transcript"]
+        )
+        self.batch_prompt = PromptTemplate(
+            template="""Do this for each of the following {count} videos.
+            
+            {videos}
+            
+            Respond ONLY with a JSON object in this format, with one entry per video:
+            {{"videos": [{{"index": video_number, "category_index": chosen_category_number, "summary": "your_summary"}}]}}""",
+            input_variables=["count", "videos"]
+        )
+        
+        # Cheap yes/no prompt used to skip videos outside the category filter
+        self.gate_prompt = PromptTemplate(
+            template="""Answer YES or NO: does this video primarily concern one of: {categories}?
+            
+            Title: {title}
+            Transcript excerpt: {snippet}
+            
+            Respond ONLY with a JSON object in this format:
+            {{"answer": "YES or NO"}}""",
+            input_variables=["categories", "title", "snippet"]
+        )
+
+        # Per-video prompts only vary in title and transcript, so render the rest once
+        self._category_prompt_parts = _split_prompt(self.category_prompt)
+        self._summary_prompt_parts = _split_prompt(self.summary_prompt)
+        self._combined_prompt_parts = _split_prompt(self.combined_prompt)
+        self._rendered_system_prompts: Dict[str, str] = {}
+        
+        # Results keyed by model, prompts and input, persisted to cache_path if given
+        self._init_result_cache(cache_path)
+
+    def _init_result_cache(self, cache_path: Optional[str]) -> None:
+        """Open the persistent (category, summary) cache, if configured."""
+        self._result_cache: Dict[str, Tuple[str, str]] = {}
+        self._result_cache_lock = threading.Lock()
+        self._disk_cache: Optional[shelve.Shelf] = None
+        if cache_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+                self._disk_cache = shelve.open(cache_path)
+            except Exception as e:
+                print(f"Warning: Could not open result cache at {cache_path}: {str(e)}")
+        
+        # Changing the model or the prompts invalidates previously cached results
+        self._cache_salt = "|".join(
+            (self.model_name, self.combined_system_prompt.template, self.combined_prompt.template)
+        )
+
+    def _result_cache_key(self, title: str, transcript: str) -> str:
+        """Hash the inputs that determine a video's category and summary."""
+        return hashlib.blake2b(
+            f"{self._cache_salt}|{title}|{transcript}".encode(),
+            digest_size=16
+        ).hexdigest()
+
+    def _get_cached_result(self, title: str, transcript: str) -> Optional[Tuple[str, str]]:
+        """Return a previously computed (category, summary), if any."""
+        key = self._result_cache_key(title, transcript)
+        with self._result_cache_lock:
+            result = self._result_cache.get(key)
+            if result is None and self._disk_cache is not None:
+                result = self._disk_cache.get(key)
+                if result is not None:
+                    self._result_cache[key] = result
+        if result is not None:
+            self._resolve_category(result[0])
+        return result
+
+    def _store_result(self, title: str, transcript: str, category: str, summary: str) -> None:
+        """Remember a successfully computed (category, summary)."""
+        if category == "Uncategorized" or summary == "Failed to generate summary.":
+            return
+        key = self._result_cache_key(title, transcript)
+        with self._result_cache_lock:
+            self._result_cache[key] = (category, summary)
+            if self._disk_cache is not None:
+                self._disk_cache[key] = (category, summary)
+
+    def close(self) -> None:
+        """Flush the persistent result cache and release the LLM's connections."""
+        with self._result_cache_lock:
+            if self._disk_cache is not None:
+                self._disk_cache.close()
+                self._disk_cache = None
+        self.llm.close()
+
+    def __enter__(self) -> TranscriptProcessor:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def set_filter_categories(self, categories: Optional[str] = None) -> None:
         """Set categories to filter by."""
@@ -106,8 +295,7 @@ class TranscriptProcessor:
             self.filter_categories = {self._normalize_category(cat) for cat in categories.split(',')}
             
             # Validate categories against valid ones
-            normalized_valid_categories = {self._normalize_category(cat) for cat in self.valid_categories}
-            invalid_categories = self.filter_categories - normalized_valid_categories
+            invalid_categories = self.filter_categories - self._normalized_valid.keys()
             
             if invalid_categories:
                 closest_matches = {
@@ -130,7 +318,10 @@ class TranscriptProcessor:
     def _find_closest_match(self, category: str, valid_categories: Set[str]) -> str:
         """Find the closest matching valid category."""
         normalized_category = self._normalize_category(category)
-        normalized_valid = {self._normalize_category(cat): cat for cat in valid_categories}
+        if valid_categories is self.valid_categories:
+            normalized_valid = self._normalized_valid
+        else:
+            normalized_valid = {self._normalize_category(cat): cat for cat in valid_categories}
         
         # First try exact match after normalization
         if normalized_category in normalized_valid:
@@ -150,36 +341,114 @@ class TranscriptProcessor:
             return True  # No filter means all categories match
         return self._normalize_category(category) in self.filter_categories
 
+    def _condense_transcript(self, transcript: str, max_chars: Optional[int] = None) -> str:
+        """Reduce a long transcript to a diverse subset of its sentences."""
+        max_chars = self.max_context_chars if max_chars is None else max_chars
+        if not max_chars or len(transcript) <= max_chars:
+            return transcript
+        
+        sentences = _SENTENCE_RE.split(transcript)
+        if len(sentences) < 3:
+            # Auto-generated transcripts are often unpunctuated; use fixed-size word windows instead
+            words = transcript.split()
+            sentences = [
+                ' '.join(words[i:i + _CONDENSE_WINDOW_WORDS])
+                for i in range(0, len(words), _CONDENSE_WINDOW_WORDS)
+            ]
+            if not sentences:
+                # Whitespace-only transcript: nothing worth keeping
+                return ""
+        
+        # Keep as many sentences as fit on average: the opening and closing ones,
+        # plus an evenly strided sample of the middle
+        average_length = len(transcript) / len(sentences)
+        keep = max(1, int(max_chars / (average_length + 1)))
+        edge = keep // 4
+        middle = range(edge, len(sentences) - edge)
+        stride = max(1, len(middle) / max(1, keep - 2 * edge))
+        indices = sorted(
+            set(range(edge))
+            | {middle[int(i * stride)] for i in range(keep - 2 * edge) if int(i * stride) < len(middle)}
+            | set(range(len(sentences) - edge, len(sentences)))
+        )
+        
+        return ' '.join(sentences[i] for i in indices)[:max_chars]
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Roughly estimate the number of tokens in a text (about 4 characters each)."""
+        return len(text) // 4
+
+    def _fit_transcript(self, transcript: str, max_tokens: Optional[int] = None) -> str:
+        """Condense a transcript, tightening the budget if it would not fit in `max_tokens`."""
+        if max_tokens is None:
+            max_tokens = self.max_ctx_tokens - _RESERVED_PROMPT_TOKENS
+        transcript = self._condense_transcript(transcript)
+        if self._estimate_tokens(transcript) > max_tokens:
+            transcript = self._condense_transcript(transcript, max_chars=max(1, max_tokens) * 4)
+        return transcript
+
+    def _category_system_kwargs(self) -> Dict[str, str]:
+        """Format the category lists shared by the categorization prompts."""
+        if self._preselected_str is None:
+            self._preselected_str = ", ".join(sorted(self.preselected_categories)) if self.preselected_categories else "Uncategorized"
+        return {
+            "preselected_categories": self._preselected_str,
+            "categories": self._category_menu
+        }
+
+    def _render_prompt(self, parts: Tuple[str, str, str], title: str, transcript: str) -> str:
+        """Fill a pre-rendered prompt with the video's title and condensed transcript."""
+        prefix, middle, suffix = parts
+        return "".join((prefix, title, middle, self._fit_transcript(transcript), suffix))
+
+    def _system_prompt(self, name: str) -> str:
+        """Render a category system prompt, reusing it until the preselected categories change."""
+        kwargs = self._category_system_kwargs()
+        rendered = self._rendered_system_prompts.get(name)
+        if rendered is None:
+            rendered = getattr(self, name).format(**kwargs)
+            self._rendered_system_prompts[name] = rendered
+        return rendered
+
+    def _category_from_result(self, result: Dict[str, Any]) -> str:
+        """Read the category from an LLM response, by menu index or else by name."""
+        index = result.get("category_index")
+        try:
+            if index is not None and 0 <= int(index) < len(self._category_list):
+                return self._resolve_category(self._category_list[int(index)])
+        except (TypeError, ValueError):
+            pass
+        
+        # Malformed or out-of-range indices fall back to matching a category name
+        return self._resolve_category(str(result.get("category", "Uncategorized")))
+
+    def _resolve_category(self, category: str) -> str:
+        """Map an LLM category onto a valid category, remembering it for future prompts."""
+        valid_category = self._normalized_valid.get(self._normalize_category(category))
+        if valid_category is None:
+            return category
+        
+        # Add to preselected categories for future use
+        if valid_category not in self.preselected_categories:
+            self.preselected_categories.add(valid_category)
+            self._preselected_str = None
+            self._rendered_system_prompts = {}
+        return valid_category
+
     def _get_category(self, title: str, transcript: str) -> str:
         """Get category for the video."""
         try:
-            # Format preselected categories for the prompt
-            preselected_cats = ", ".join(sorted(self.preselected_categories)) if self.preselected_categories else "Uncategorized"
-            
-            # Invoke LLM for categorization
-            response = self.llm.invoke(
-                self.category_prompt.format(
-                    preselected_categories=preselected_cats,
-                    categories=", ".join(sorted(self.valid_categories)),
-                    title=title,
-                    transcript=transcript
-                )
+            # Invoke LLM for categorization, stopping as soon as the JSON answer is complete
+            response = self.llm.invoke_json(
+                self._render_prompt(self._category_prompt_parts, title, transcript),
+                system=self._system_prompt("category_system_prompt"),
+                max_tokens=_CATEGORY_MAX_TOKENS
             )
             
             # Parse response
-            result = json.loads(response)
-            category = result.get("category", "Uncategorized")
-            
-            # Try to match with valid categories
-            if category != "Uncategorized":
-                normalized_category = self._normalize_category(category)
-                for valid_category in self.valid_categories:
-                    if self._normalize_category(valid_category) == normalized_category:
-                        # Add to preselected categories for future use
-                        self.preselected_categories.add(valid_category)
-                        return valid_category
-            
-            return category
+            result = orjson.loads(response)
+            return self._category_from_result(result)
         except Exception as e:
             print(f"Error getting category: {str(e)}")
             return "Uncategorized"
@@ -189,19 +458,171 @@ class TranscriptProcessor:
         try:
             # Invoke LLM for summarization
             response = self.llm.invoke(
-                self.summary_prompt.format(
-                    title=title,
-                    transcript=transcript
-                )
+                self._render_prompt(self._summary_prompt_parts, title, transcript),
+                system=self.summary_system_prompt
             )
             
             # Parse response
-            result = json.loads(response)
+            result = orjson.loads(response)
             return result.get("summary", "Failed to generate summary.")
         except Exception as e:
             print(f"Error getting summary: {str(e)}")
             return "Failed to generate summary."
 
+    def _combined_messages(self, title: str, transcript: str) -> Tuple[str, str]:
+        """Format the (prompt, system) pair for a combined category and summary call."""
+        return (
+            self._render_prompt(self._combined_prompt_parts, title, transcript),
+            self._system_prompt("combined_system_prompt")
+        )
+
+    def _parse_combined(self, response: str) -> Tuple[str, str]:
+        """Parse the category and summary from a combined call's response."""
+        result = orjson.loads(response)
+        category = self._category_from_result(result)
+        return category, result.get("summary", "Failed to generate summary.")
+
+    def _get_combined(self, title: str, transcript: str) -> Tuple[str, str]:
+        """Get category and summary for the video with a single LLM call."""
+        try:
+            prompt, system = self._combined_messages(title, transcript)
+            return self._parse_combined(self.llm.invoke(prompt, system=system))
+        except Exception as e:
+            print(f"Error getting category and summary: {str(e)}")
+            return "Uncategorized", "Failed to generate summary."
+
+    async def _aget_combined(self, title: str, transcript: str) -> Tuple[str, str]:
+        """Asynchronous `_get_combined`."""
+        try:
+            prompt, system = self._combined_messages(title, transcript)
+            return self._parse_combined(await self.llm.ainvoke(prompt, system=system))
+        except Exception as e:
+            print(f"Error getting category and summary: {str(e)}")
+            return "Uncategorized", "Failed to generate summary."
+
+    def get_category_and_summary(self, title: str, transcript: str) -> Tuple[str, str]:
+        """Get category and summary for the video."""
+        try:
+            cached = self._get_cached_result(title, transcript)
+            if cached is not None:
+                return cached
+            category, summary = self._get_combined(title, transcript)
+            self._store_result(title, transcript, category, summary)
+            return category, summary
+        except Exception as e:
+            print(f"Error getting category and summary: {str(e)}")
+            return "Uncategorized", "Failed to generate summary."
+
+    async def aget_category_and_summary(self, title: str, transcript: str) -> Tuple[str, str]:
+        """Asynchronous `get_category_and_summary`."""
+        try:
+            cached = self._get_cached_result(title, transcript)
+            if cached is not None:
+                return cached
+            category, summary = await self._aget_combined(title, transcript)
+            self._store_result(title, transcript, category, summary)
+            return category, summary
+        except Exception as e:
+            print(f"Error getting category and summary: {str(e)}")
+            return "Uncategorized", "Failed to generate summary."
+
+    def _gate_prompt(self, title: str, transcript: str) -> str:
+        """Format the quick gate prompt for the current category filter."""
+        categories = ", ".join(sorted(
+            self._normalized_valid.get(cat, cat) for cat in self.filter_categories
+        ))
+        return self.gate_prompt.format(
+            categories=categories,
+            title=title,
+            snippet=transcript[:_GATE_SNIPPET_CHARS]
+        )
+
+    def _parse_gate(self, response: str) -> bool:
+        """Read the gate's answer, letting the video through unless it is clearly NO."""
+        try:
+            answer = str(orjson.loads(response).get("answer", ""))
+        except (orjson.JSONDecodeError, AttributeError):
+            answer = response
+        words = answer.strip().split()
+        return not words or words[0].strip('.,!"').upper() != "NO"
+
+    def quick_gate(self, title: str, transcript: str) -> bool:
+        """Cheaply check whether a video may match the category filter before processing it."""
+        if not self.filter_categories or self._get_cached_result(title, transcript) is not None:
+            return True
+        try:
+            return self._parse_gate(
+                self.llm.invoke_json(self._gate_prompt(title, transcript), max_tokens=_GATE_MAX_TOKENS)
+            )
+        except Exception as e:
+            print(f"Error in category gate: {str(e)}")
+            return True
+
+    async def aquick_gate(self, title: str, transcript: str) -> bool:
+        """Asynchronous `quick_gate`."""
+        if not self.filter_categories or self._get_cached_result(title, transcript) is not None:
+            return True
+        try:
+            return self._parse_gate(
+                await self.llm.ainvoke_json(self._gate_prompt(title, transcript), max_tokens=_GATE_MAX_TOKENS)
+            )
+        except Exception as e:
+            print(f"Error in category gate: {str(e)}")
+            return True
+
+    def _get_batch(self, items: List[Tuple[str, str]]) -> Dict[int, Dict[str, str]]:
+        """Get category and summary for several videos with a single LLM call."""
+        # The videos share the context window, so each gets an equal part of it
+        video_tokens = (self.max_ctx_tokens - _RESERVED_PROMPT_TOKENS) // len(items)
+        videos = "\n\n".join(
+            f"--- VIDEO {index} ---\nTitle: {title}\nTranscript: {self._fit_transcript(transcript, video_tokens)}"
+            for index, (title, transcript) in enumerate(items)
+        )
+        response = self.llm.invoke(
+            self.batch_prompt.format(count=len(items), videos=videos),
+            system=self._system_prompt("combined_system_prompt")
+        )
+        
+        # Parse response, tolerating a bare array instead of the requested object
+        result = orjson.loads(response)
+        entries = result.get("videos", []) if isinstance(result, dict) else result
+        
+        results = {}
+        for entry in entries:
+            index = entry.get("index")
+            category = self._category_from_result(entry)
+            summary = entry.get("summary")
+            if isinstance(index, int) and 0 <= index < len(items) and category != "Uncategorized" and summary:
+                results[index] = {"category": category, "summary": summary}
+        return results
+
+    def get_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Dict[str, str]]]:
+        """Categorize and summarize several (title, transcript) pairs, in order."""
+        results: Dict[int, Dict[str, str]] = {}
+        for index, (title, transcript) in enumerate(items):
+            cached = self._get_cached_result(title, transcript)
+            if cached is not None:
+                results[index] = {"category": cached[0], "summary": cached[1]}
+        
+        # Only videos without cached results are sent to the LLM
+        pending = [index for index in range(len(items)) if index not in results]
+        if len(pending) > 1:
+            try:
+                batch_results = self._get_batch([items[index] for index in pending])
+            except Exception as e:
+                print(f"Error in batch categorization, processing videos individually: {str(e)}")
+                batch_results = {}
+            for batch_index, result in batch_results.items():
+                index = pending[batch_index]
+                results[index] = result
+                self._store_result(*items[index], result["category"], result["summary"])
+        
+        # Videos missing from the batch response are processed one by one
+        return [
+            results[index] if index in results else self.process_video(title, transcript)
+            for index, (title, transcript) in enumerate(items)
+        ]
+
     def get_category(self, title: str, transcript: str) -> str:
         """Get category for the video."""
         try:
@@ -223,8 +644,7 @@ class TranscriptProcessor:
     def process_video(self, title: str, transcript: str) -> Optional[Dict[str, str]]:
         """Categorize and summarize the video."""
         try:
-            category = self.get_category(title, transcript)
-            summary = self.get_summary(title, transcript)
+            category, summary = self.get_category_and_summary(title, transcript)
             
             # If either call returned default values due to errors, return None
             if category == "Uncategorized" or summary == "Failed to generate summary.":
@@ -23,26 +23,40 @@ from rich.progress import (
 )
 from rich.console import Console
 from rich.text import Text
-from collections import defaultdict
-from time import time
-from datetime import datetime, timedelta
+from time import time, perf_counter, localtime, strftime, sleep
+from math import inf
+import threading
 import os
+import logging
+import random
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
+from functools import wraps
 import psutil
 import platform
-import multiprocessing
 import subprocess
 from shutil import which
 import pickle
+import json
+from pathlib import Path
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+from functools import lru_cache
 
 console = Console()
 
+# Environment variable that pins the GPU count and skips hardware detection
+GPU_COUNT_ENV_VAR = 'YT_PLAYLIST_SUMMARY_NUM_GPUS'
+
+_NON_WORD_RE = re.compile(r'[^\w\s-]')
+_DASH_SPACE_RE = re.compile(r'[-\s]+')
+
 class ETAColumn(ProgressColumn):
     """Renders estimated completion time."""
     def __init__(self):
         super().__init__()
         self.start_time = time()
+        # (ETA second, rendered text) from the last refresh
+        self._last_eta = None
 
     @property
     def _header(self) -> Text:
@@ -54,20 +68,51 @@ class ETAColumn(ProgressColumn):
         if task.finished:
             return Text("Done!")
         
-        elapsed = time() - self.start_time
-        if task.speed is None or elapsed < 1:
+        now = time()
+        if task.speed is None or now - self.start_time < 1:
             return Text("calculating...")
         
         remaining = task.total - task.completed
-        eta_seconds = remaining / task.speed
-        eta_time = datetime.now() + timedelta(seconds=eta_seconds)
-        return Text(f"ETA: {eta_time.strftime('%H:%M:%S')}", style="cyan", justify="right")
+        eta_second = int(now + remaining / task.speed)
+        if self._last_eta is None or self._last_eta[0] != eta_second:
+            text = Text(f"ETA: {strftime('%H:%M:%S', localtime(eta_second))}", style="cyan", justify="right")
+            self._last_eta = (eta_second, text)
+        return self._last_eta[1]
+
+def retry_on_exception(retries=3, delay=3, exceptions=(Exception,)):
+    """Retry on `exceptions` with jittered exponential backoff, starting at `delay` seconds."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(retries):
+                try:
+                    return func(*args, **kwargs)
+                except exceptions as e:
+                    if attempt == retries - 1:  # Last attempt
+                        raise e
+                    backoff = delay * (2 ** attempt)
+                    backoff += random.uniform(0, backoff / 2)
+                    logging.warning(f"Attempt {attempt + 1} failed, retrying in {backoff:.1f} seconds...")
+                    sleep(backoff)
+            return None
+        return wrapper
+    return decorator
+
+@lru_cache(maxsize=1)
+def _null_device():
+    """Open the null device on first use and keep it for the life of the process."""
+    return open(os.devnull, 'w')
+
+@contextmanager
+def suppress_stdout_stderr():
+    """Context manager to suppress stdout and stderr."""
+    null_device = _null_device()
+    with redirect_stdout(null_device), redirect_stderr(null_device):
+        yield
 
 def sanitize_filename(title: str) -> str:
     """Convert title to a valid filename."""
-    sanitized = re.sub(r'[^\w\s-]', '', title.lower())
-    sanitized = re.sub(r'[-\s]+', '_', sanitized)
-    return sanitized.strip('_')
+    return _DASH_SPACE_RE.sub('_', _NON_WORD_RE.sub('', title.lower())).strip('_')
 
 def create_progress() -> Progress:
     """Create a custom progress bar."""
@@ -88,21 +133,37 @@ def create_progress() -> Progress:
 
 def measure_time(operation: str, func, timing_stats=None, *args, **kwargs):
     """Measure time taken by an operation."""
-    start_time = time()
+    start_time = perf_counter()
     result = func(*args, **kwargs)
     if timing_stats:
-        timing_stats.add_timing(operation, time() - start_time)
+        timing_stats.add_timing(operation, perf_counter() - start_time)
+    return result
+
+async def ameasure_time(operation: str, func, timing_stats=None, *args, **kwargs):
+    """Measure time taken by an asynchronous operation."""
+    start_time = perf_counter()
+    result = await func(*args, **kwargs)
+    if timing_stats:
+        timing_stats.add_timing(operation, perf_counter() - start_time)
     return result
 
+# Output directories already created during this run
+_created_dirs = set()
+
+def _write_output(path: Path, content: str) -> None:
+    """Write text to `path`, creating its directory the first time it is used."""
+    parent = path.parent.absolute()
+    if parent not in _created_dirs:
+        parent.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(parent)
+    path.write_text(content, encoding='utf-8')
+
 def save_markdown(content: str, playlist_title: str, num_videos: int = None, suffix: str = None, output_path: str = None) -> str:
     """Save markdown content to file and return filename."""
     if output_path:
-        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        _write_output(Path(output_path), content)
         return output_path
     
-    os.makedirs('output', exist_ok=True)
     filename_prefix = sanitize_filename(playlist_title)
     if num_videos is not None:
         filename_prefix += f"_first_{num_videos}"
@@ -110,9 +171,22 @@ def save_markdown(content: str, playlist_title: str, num_videos: int = None, suf
         filename_prefix += suffix
     output_filename = f"output/{filename_prefix}.md"
     
-    with open(output_filename, 'w', encoding='utf-8') as f:
-        f.write(content)
+    _write_output(Path(output_filename), content)
+    return output_filename
+
+def save_transcripts(transcripts: dict, playlist_title: str, num_videos: int = None, output_path: str = None) -> str:
+    """Save extracted transcripts as JSON and return filename."""
+    content = json.dumps(transcripts, indent=2, ensure_ascii=False)
+    if output_path:
+        _write_output(Path(output_path), content)
+        return output_path
+    
+    filename_prefix = sanitize_filename(playlist_title)
+    if num_videos is not None:
+        filename_prefix += f"_first_{num_videos}"
+    output_filename = f"output/{filename_prefix}_transcripts.json"
     
+    _write_output(Path(output_filename), content)
     return output_filename
 
 def print_configuration(args, playlist_url):
@@ -120,63 +194,204 @@ def print_configuration(args, playlist_url):
     if not args.verbose:
         return
     
-    console.print("\n[bold cyan]Configuration:[/bold cyan]")
-    console.print("┌" + "─" * 50 + "┐")
-    
-    # Playlist settings
-    console.print("│ [yellow]Playlist Settings[/yellow]")
-    console.print(f"│ • URL: [green]{playlist_url}[/green]")
-    
-    # Processing settings
-    console.print("│ [yellow]Processing Settings[/yellow]")
-    console.print(f"│ • Videos to process: [green]{args.videos if args.videos else 'all'}[/green]")
-    console.print(f"│ • Batch size: [green]{args.batch_size}[/green]")
-    
-    # Hardware settings
-    console.print("│ [yellow]Hardware Settings[/yellow]")
-    console.print(f"│ • GPUs: [green]{args.num_gpus}[/green]")
-    console.print(f"│ • CPU cores: [green]{args.num_cpus}[/green]")
-    console.print(f"│ • Threads: [green]{args.threads}[/green]")
-    
-    # Model settings
-    console.print("│ [yellow]Model Settings[/yellow]")
-    console.print(f"│ • Model: [green]{args.model}[/green]")
-    
-    # Filter settings
-    console.print("│ [yellow]Filter Settings[/yellow]")
-    console.print(f"│ • Categories: [green]{args.categories if args.categories else 'all'}[/green]")
-    
-    # Output settings
-    console.print("│ [yellow]Output Settings[/yellow]")
-    console.print(f"│ • Output path: [green]{args.output if args.output else 'auto'}[/green]")
-    console.print(f"│ • Verbose mode: [green]{'enabled' if args.verbose else 'disabled'}[/green]")
-    
-    console.print("└" + "─" * 50 + "┘\n")
+    lines = [
+        "\n[bold cyan]Configuration:[/bold cyan]",
+        "┌" + "─" * 50 + "┐",
+
+        # Playlist settings
+        "│ [yellow]Playlist Settings[/yellow]",
+        f"│ • URL: [green]{playlist_url}[/green]",
+
+        # Processing settings
+        "│ [yellow]Processing Settings[/yellow]",
+        f"│ • Videos to process: [green]{args.videos if args.videos else 'all'}[/green]",
+        f"│ • Batch size: [green]{args.batch_size}[/green]",
+        f"│ • Videos per LLM call: [green]{args.videos_per_call}[/green]",
+
+        # Hardware settings
+        "│ [yellow]Hardware Settings[/yellow]",
+        f"│ • GPUs: [green]{args.num_gpus}[/green]",
+        f"│ • CPU cores: [green]{args.num_cpus}[/green]",
+        f"│ • Threads: [green]{args.threads}[/green]",
+
+        # Model settings
+        "│ [yellow]Model Settings[/yellow]",
+        f"│ • Model: [green]{args.model}[/green]",
+
+        # Filter settings
+        "│ [yellow]Filter Settings[/yellow]",
+        f"│ • Categories: [green]{args.categories if args.categories else 'all'}[/green]",
+
+        # Output settings
+        "│ [yellow]Output Settings[/yellow]",
+        f"│ • Output path: [green]{args.output if args.output else 'auto'}[/green]",
+        f"│ • Verbose mode: [green]{'enabled' if args.verbose else 'disabled'}[/green]",
+
+        "└" + "─" * 50 + "┘\n",
+    ]
+    # One render pass for the whole box instead of one per line
+    console.print("\n".join(lines))
 
 class TimingStats:
     def __init__(self):
-        self.timings = defaultdict(list)
+        # Running (count, total, min, max) per operation, so memory stays constant
+        self.timings: Dict[str, Tuple[int, float, float, float]] = {}
+        self._lock = threading.Lock()
     
     def add_timing(self, operation: str, duration: float):
         """Add a timing measurement for an operation."""
-        self.timings[operation].append(duration)
+        with self._lock:
+            count, total, low, high = self.timings.get(operation, (0, 0.0, inf, -inf))
+            self.timings[operation] = (count + 1, total + duration, min(low, duration), max(high, duration))
     
     def print_stats(self):
         """Print formatted timing statistics."""
         if not self.timings:
             return
         
-        console.print("\n[bold cyan]Timing Statistics:[/bold cyan]")
-        console.print("┌" + "─" * 50 + "┐")
+        lines = ["\n[bold cyan]Timing Statistics:[/bold cyan]", "┌" + "─" * 50 + "┐"]
         
         for operation in sorted(self.timings.keys()):
-            times = self.timings[operation]
-            avg_time = sum(times) / len(times)
-            console.print(f"│ [yellow]{operation}[/yellow]")
-            console.print(f"│ • Average time: [green]{avg_time:.2f}s[/green]")
-            console.print(f"│ • Total calls: [green]{len(times)}[/green]")
+            count, total, low, high = self.timings[operation]
+            lines.append(f"│ [yellow]{operation}[/yellow]")
+            lines.append(f"│ • Average time: [green]{total / count:.2f}s[/green]")
+            lines.append(f"│ • Min / max time: [green]{low:.2f}s / {high:.2f}s[/green]")
+            lines.append(f"│ • Total calls: [green]{count}[/green]")
         
-        console.print("└" + "─" * 50 + "┘\n") 
+        lines.append("└" + "─" * 50 + "┘\n")
+        console.print("\n".join(lines))
+
+def _nvml_gpu_count() -> Optional[int]:
+    """Count NVIDIA GPUs through NVML, or None if pynvml is unavailable."""
+    try:
+        import pynvml
+    except ImportError:
+        return None
+    try:
+        pynvml.nvmlInit()
+    except pynvml.NVMLError:
+        return 0  # No NVIDIA driver loaded
+    try:
+        return pynvml.nvmlDeviceGetCount()
+    finally:
+        pynvml.nvmlShutdown()
+
+def _metal_gpu_count() -> Optional[int]:
+    """Count Metal devices through pyobjc, or None if it is unavailable."""
+    try:
+        from Metal import MTLCopyAllDevices
+    except ImportError:
+        return None
+    return len(MTLCopyAllDevices())
+
+@lru_cache(maxsize=None)
+def _cached_gpu_count(verbose: bool = False) -> int:
+    """Detect the number of available GPUs once per process.
+    
+    On Linux and Windows NVML is queried first and nvidia-smi only runs without
+    pynvml. On macOS the ioreg subprocess runs first, because only it reports the
+    GPU core count; Metal device enumeration is the fallback when ioreg has none.
+    """
+    system = platform.system()
+    
+    if system == "Darwin":  # macOS
+        try:
+            # Check if ioreg exists
+            if not which('ioreg'):
+                if verbose:
+                    console.log("[yellow]Warning: ioreg not found, defaulting to 1 GPU[/yellow]")
+                return 1
+            
+            # Use ioreg to detect GPUs and their cores
+            result = subprocess.run(['ioreg', '-l', '-w', '0'], 
+                                 capture_output=True, text=True)
+            
+            # Look for GPUConfigurationVariable
+            for line in result.stdout.split('\n'):
+                if 'GPUConfigurationVariable' in line:
+                    # Extract the JSON-like string
+                    config_start = line.find('{')
+                    if config_start != -1:
+                        config_str = line[config_start:]
+                        # Parse num_cores from the configuration
+                        if '"num_cores"=' in config_str:
+                            num_cores = int(config_str.split('"num_cores"=')[1].split(',')[0])
+                            return num_cores
+            
+            # Metal has no core count, so it only replaces the device scan below
+            metal_count = _metal_gpu_count()
+            if metal_count is not None:
+                return max(1, metal_count)
+            
+            # Without pyobjc, count GPU device lines instead
+            gpu_count = len([line for line in result.stdout.split('\n') 
+                            if any(gpu_identifier in line 
+                                  for gpu_identifier in ['GPU', 'Metal'])])
+            
+            if gpu_count == 0:
+                # Check if system_profiler exists
+                if not which('system_profiler'):
+                    if verbose:
+                        console.log("[yellow]Warning: system_profiler not found, defaulting to 1 GPU[/yellow]")
+                    return 1
+                
+                # Alternative method using system_profiler
+                result = subprocess.run(['system_profiler', 'SPDisplaysDataType'],
+                                      capture_output=True, text=True)
+                gpu_count = len([line for line in result.stdout.split('\n')
+                                if any(gpu_identifier in line
+                                      for gpu_identifier in ['Chipset Model:', 'Processor:'])])
+            
+            return max(1, gpu_count)  # At least 1 GPU if any graphics capability is detected
+        except Exception as e:
+            if verbose:
+                console.log(f"[yellow]Warning: Error detecting GPUs: {str(e)}[/yellow]")
+            return 1  # Default to 1 on macOS as it always has some graphics capability
+    elif system in ("Linux", "Windows"):
+        try:
+            # Query NVML directly, avoiding an nvidia-smi subprocess
+            nvml_count = _nvml_gpu_count()
+            if nvml_count is not None:
+                return nvml_count
+        except Exception as e:
+            if verbose:
+                console.log(f"[yellow]Warning: Error detecting GPUs through NVML: {str(e)}[/yellow]")
+    
+    if system == "Linux":
+        try:
+            # Check for NVIDIA GPUs using nvidia-smi
+            if which('nvidia-smi'):
+                result = subprocess.run(['nvidia-smi', '-L'], 
+                                     capture_output=True, text=True)
+                return len(result.stdout.strip().split('\n'))
+        except:
+            pass
+    elif system == "Windows":
+        try:
+            # Check for NVIDIA GPUs using nvidia-smi on Windows
+            if which('nvidia-smi'):
+                result = subprocess.run(['nvidia-smi', '-L'], 
+                                     capture_output=True, text=True, shell=True)
+                return len(result.stdout.strip().split('\n'))
+        except:
+            pass
+    
+    return 0  # Default to no GPUs if detection fails
+
+def _available_cpu_count() -> int:
+    """Count the CPUs this process may run on, honouring cpuset/affinity limits."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS or Windows
+        return os.cpu_count() or 1
+
+@lru_cache(maxsize=None)
+def _cached_cpu_count() -> int:
+    """Get the recommended number of CPU cores once per process."""
+    cpu_count = _available_cpu_count()
+    # Reserve some cores for system operations
+    recommended_cores = max(1, cpu_count - 2)
+    return recommended_cores
 
 class SystemInfo:
     """Detect and provide system hardware information."""
@@ -184,84 +399,16 @@ class SystemInfo:
     @staticmethod
     def get_gpu_count(verbose: bool = False) -> int:
         """Get number of available GPUs."""
-        system = platform.system()
-        
-        if system == "Darwin":  # macOS
-            try:
-                # Check if ioreg exists
-                if not which('ioreg'):
-                    if verbose:
-                        console.log("[yellow]Warning: ioreg not found, defaulting to 1 GPU[/yellow]")
-                    return 1
-                
-                # Use ioreg to detect GPUs and their cores
-                result = subprocess.run(['ioreg', '-l', '-w', '0'], 
-                                     capture_output=True, text=True)
-                
-                # Look for GPUConfigurationVariable
-                for line in result.stdout.split('\n'):
-                    if 'GPUConfigurationVariable' in line:
-                        # Extract the JSON-like string
-                        config_start = line.find('{')
-                        if config_start != -1:
-                            config_str = line[config_start:]
-                            # Parse num_cores from the configuration
-                            if '"num_cores"=' in config_str:
-                                num_cores = int(config_str.split('"num_cores"=')[1].split(',')[0])
-                                return num_cores
-                
-                # Fallback to checking for GPU devices if configuration not found
-                gpu_count = len([line for line in result.stdout.split('\n') 
-                                if any(gpu_identifier in line 
-                                      for gpu_identifier in ['GPU', 'Metal'])])
-                
-                if gpu_count == 0:
-                    # Check if system_profiler exists
-                    if not which('system_profiler'):
-                        if verbose:
-                            console.log("[yellow]Warning: system_profiler not found, defaulting to 1 GPU[/yellow]")
-                        return 1
-                    
-                    # Alternative method using system_profiler
-                    result = subprocess.run(['system_profiler', 'SPDisplaysDataType'],
-                                          capture_output=True, text=True)
-                    gpu_count = len([line for line in result.stdout.split('\n')
-                                    if any(gpu_identifier in line
-                                          for gpu_identifier in ['Chipset Model:', 'Processor:'])])
-                
-                return max(1, gpu_count)  # At least 1 GPU if any graphics capability is detected
-            except Exception as e:
-                if verbose:
-                    console.log(f"[yellow]Warning: Error detecting GPUs: {str(e)}[/yellow]")
-                return 1  # Default to 1 on macOS as it always has some graphics capability
-        elif system == "Linux":
-            try:
-                # Check for NVIDIA GPUs using nvidia-smi
-                if which('nvidia-smi'):
-                    result = subprocess.run(['nvidia-smi', '-L'], 
-                                         capture_output=True, text=True)
-                    return len(result.stdout.strip().split('\n'))
-            except:
-                pass
-        elif system == "Windows":
-            try:
-                # Check for NVIDIA GPUs using nvidia-smi on Windows
-                if which('nvidia-smi'):
-                    result = subprocess.run(['nvidia-smi', '-L'], 
-                                         capture_output=True, text=True, shell=True)
-                    return len(result.stdout.strip().split('\n'))
-            except:
-                pass
-        
-        return 0  # Default to no GPUs if detection fails
+        # A pinned count skips detection and its subprocesses entirely
+        pinned = os.environ.get(GPU_COUNT_ENV_VAR)
+        if pinned:
+            return int(pinned)
+        return _cached_gpu_count(verbose)
     
     @staticmethod
     def get_cpu_count() -> int:
         """Get optimal number of CPU cores to use."""
-        cpu_count = multiprocessing.cpu_count()
-        # Reserve some cores for system operations
-        recommended_cores = max(1, cpu_count - 2)
-        return recommended_cores
+        return _cached_cpu_count()
     
     @staticmethod
     def get_memory_info() -> dict:
@@ -280,26 +427,30 @@ class SystemInfo:
         memory_info = cls.get_memory_info()
         system = platform.system()
         
+        cpu_count = cls.get_cpu_count()
+        
         settings = {
             'num_gpus': cls.get_gpu_count(verbose),
-            'num_cpus': cls.get_cpu_count(),
+            'num_cpus': cpu_count,
             'num_threads': min(
-                cls.get_cpu_count(),
+                cpu_count,
                 memory_info['recommended_threads']
             )
         }
         
         if verbose:
             # Log system information
-            console.log(f"[bold cyan]System Information:[/bold cyan]")
-            console.log(f"• System: {system}")
-            console.log(f"• CPU cores available: {multiprocessing.cpu_count()}")
-            console.log(f"• GPUs available: {settings['num_gpus']}")
-            console.log(f"• Memory available: {memory_info['available'] / (1024**3):.1f}GB")
-            console.log(f"• Memory usage: {memory_info['percent']}%")
-            console.log("\n[bold cyan]Recommended Settings:[/bold cyan]")
-            console.log(f"• Number of GPUs: {settings['num_gpus']}")
-            console.log(f"• Number of CPUs: {settings['num_cpus']}")
-            console.log(f"• Number of threads: {settings['num_threads']}")
+            console.log("\n".join([
+                "[bold cyan]System Information:[/bold cyan]",
+                f"• System: {system}",
+                f"• CPU cores available: {_available_cpu_count()}",
+                f"• GPUs available: {settings['num_gpus']}",
+                f"• Memory available: {memory_info['available'] / (1024**3):.1f}GB",
+                f"• Memory usage: {memory_info['percent']}%",
+                "\n[bold cyan]Recommended Settings:[/bold cyan]",
+                f"• Number of GPUs: {settings['num_gpus']}",
+                f"• Number of CPUs: {settings['num_cpus']}",
+                f"• Number of threads: {settings['num_threads']}",
+            ]))
         
         return settings 
\ No newline at end of file
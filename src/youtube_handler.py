@@ -11,75 +11,133 @@ You may obtain a copy of the License at
 
 import yt_dlp
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
-import time
-from typing import List, Dict, Optional
-from functools import wraps
-import logging
+from typing import Callable, List, Dict, Optional, TypedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import re
-import sys
 import os
-from contextlib import contextmanager
-import io
-from contextlib import nullcontext
 import requests
+import pickle
+import atexit
+from operator import itemgetter
+from functools import lru_cache
+from utils import TimingStats, console, measure_time, retry_on_exception
 
-def retry_on_exception(retries=3, delay=3):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            for attempt in range(retries):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    if attempt == retries - 1:  # Last attempt
-                        raise e
-                    logging.warning(f"Attempt {attempt + 1} failed, retrying in {delay} seconds...")
-                    time.sleep(delay)
-            return None
-        return wrapper
-    return decorator
+_PLAYLIST_RES = [
+    re.compile(r'youtube\.com/playlist\?list=[A-Za-z0-9_-]+$'),  # Standard playlist URL
+    re.compile(r'youtube\.com/watch\?v=[A-Za-z0-9_-]+&list=[A-Za-z0-9_-]+'),  # Video in playlist URL
+    re.compile(r'youtu\.be/[A-Za-z0-9_-]+\?list=[A-Za-z0-9_-]+')  # Shortened URL with playlist
+]
+_PLAYLIST_PREFIXES = (
+    'https://www.youtube.com/playlist?list=',
+    'https://youtube.com/playlist?list=',
+)
 
-@contextmanager
-def suppress_stdout_stderr():
-    """Context manager to suppress stdout and stderr."""
-    # Save the original stdout/stderr
-    old_stdout = sys.stdout
-    old_stderr = sys.stderr
-    
-    # Create a null device to redirect output
-    null_device = open(os.devnull, 'w')
-    
-    try:
-        # Redirect stdout/stderr to the null device
-        sys.stdout = null_device
-        sys.stderr = null_device
-        yield
-    finally:
-        # Restore original stdout/stderr
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
-        null_device.close()
+_YT_WATCH_PREFIX = 'https://www.youtube.com/watch?v='
+
+class VideoInfo(TypedDict):
+    """Playlist entry returned by YoutubeHandler.get_playlist_videos."""
+    title: str
+    url: str
+    video_id: str
+    description: str
+
+# Preferred transcript languages, in order
+_TRANSCRIPT_LANGUAGES = ['en', 'en-US', 'en-GB']
+
+# Text of one transcript segment
+_segment_text = itemgetter('text')
+
+# Network failures worth retrying; anything else is raised straight away
+_TRANSIENT_ERRORS = (requests.RequestException, yt_dlp.utils.DownloadError, ConnectionError, TimeoutError)
+
+def _warn(message: str) -> None:
+    """Print a warning through the shared Rich console, which flushes every line."""
+    # Messages embed exception text, so never parse them as markup
+    console.print(f"Warning: {message}", style="yellow", markup=False)
 
 class YoutubeHandler:
-    def __init__(self, verbose: bool = False):
+    def __init__(self, verbose: bool = False, cache_path: Optional[str] = None):
         self.verbose = verbose
         self.videos = []
+        # Downloaded transcripts by video ID, persisted to cache_path across runs
+        self.saved_transcripts: Dict[str, str] = {}
+        # Availability by video ID, seeded from the flat playlist extraction
+        self._availability: Dict[str, bool] = {}
+        self.cache_path = cache_path
+        self._cache_dirty = False
+        if cache_path:
+            self.load_transcript_cache(cache_path)
+            atexit.register(self.save_transcript_cache)
         self.ydl_opts = {
             'quiet': True,
             'extract_flat': True,
-            'force_generic_extractor': True
+            'skip_download': True
         }
+        # Built on first use; constructing YoutubeDL loads every extractor
+        self._ydl = None
+        self._probe_ydl = None
+    
+    def _get_ydl(self) -> yt_dlp.YoutubeDL:
+        """Return the shared playlist YoutubeDL instance."""
+        if self._ydl is None:
+            self._ydl = yt_dlp.YoutubeDL(self.ydl_opts)
+        return self._ydl
+    
+    def _get_probe_ydl(self) -> yt_dlp.YoutubeDL:
+        """Return the shared YoutubeDL instance used for availability checks."""
+        if self._probe_ydl is None:
+            self._probe_ydl = yt_dlp.YoutubeDL({'quiet': True, 'skip_download': True})
+        return self._probe_ydl
+    
+    def load_transcript_cache(self, path: str) -> None:
+        """Load previously downloaded transcripts from a pickle file, if it exists."""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'rb') as f:
+                self.saved_transcripts.update(pickle.load(f))
+        except Exception as e:
+            _warn(f"Could not load transcript cache from {path}: {str(e)}")
+    
+    def save_transcript_cache(self, path: Optional[str] = None) -> None:
+        """Write the downloaded transcripts to a pickle file if any were added."""
+        path = path or self.cache_path
+        if not path or not self._cache_dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            # Write to a temporary file first so an interrupted save keeps the old cache
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(dict(self.saved_transcripts), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._cache_dirty = False
+        except Exception as e:
+            _warn(f"Could not save transcript cache to {path}: {str(e)}")
     
-    def _validate_youtube_playlist_url(self, url: str) -> bool:
+    def close(self):
+        """Release the cached YoutubeDL instances."""
+        for ydl in (self._ydl, self._probe_ydl):
+            if ydl is not None:
+                ydl.close()
+        self._ydl = None
+        self._probe_ydl = None
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _validate_youtube_playlist_url(url: str) -> bool:
         """Validate if the URL is a YouTube playlist URL."""
-        youtube_patterns = [
-            r'youtube\.com/playlist\?list=[A-Za-z0-9_-]+$',  # Standard playlist URL
-            r'youtube\.com/watch\?v=[A-Za-z0-9_-]+&list=[A-Za-z0-9_-]+',  # Video in playlist URL
-            r'youtu\.be/[A-Za-z0-9_-]+\?list=[A-Za-z0-9_-]+'  # Shortened URL with playlist
-        ]
-        return any(re.search(pattern, url) is not None for pattern in youtube_patterns)
+        if 'list=' not in url:
+            return False
+        for prefix in _PLAYLIST_PREFIXES:
+            if url.startswith(prefix):
+                playlist_id = url[len(prefix):].replace('-', '').replace('_', '')
+                if playlist_id.isascii() and playlist_id.isalnum():
+                    return True
+                break
+        return any(p.search(url) for p in _PLAYLIST_RES)
     
-    def get_playlist_videos(self, playlist_url: str) -> tuple[list, str]:
+    def get_playlist_videos(self, playlist_url: str) -> tuple[List[VideoInfo], str]:
         """Get list of videos from a playlist."""
         # Validate URL first
         if not playlist_url:
@@ -94,8 +152,7 @@ class YoutubeHandler:
             )
         
         try:
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                result = ydl.extract_info(playlist_url, download=False)
+            result = self._get_ydl().extract_info(playlist_url, download=False)
                 
             if not result or 'entries' not in result:
                 raise ValueError(
@@ -113,7 +170,7 @@ class YoutubeHandler:
                         videos.append(video_info)
                 except Exception as e:
                     if self.verbose:
-                        print(f"Warning: Could not process video {entry.get('title', 'Unknown')}: {str(e)}")
+                        _warn(f"Could not process video {entry.get('title', 'Unknown')}: {str(e)}")
                     continue
             
             if not videos:
@@ -123,6 +180,7 @@ class YoutubeHandler:
                 )
             
             self.videos = videos
+            self._availability.update((video['video_id'], True) for video in videos)
             return videos, playlist_title
             
         except yt_dlp.utils.DownloadError as e:
@@ -138,63 +196,107 @@ class YoutubeHandler:
                 f"An error occurred while processing the playlist: {str(e)}"
             ) from None
     
-    @retry_on_exception(retries=3, delay=2)
-    def _get_video_info(self, entry: Dict) -> Optional[Dict]:
+    @retry_on_exception(retries=3, delay=1, exceptions=_TRANSIENT_ERRORS)
+    def _get_video_info(self, entry: Dict) -> Optional[VideoInfo]:
         """Get video information with retries."""
-        url = f"https://www.youtube.com/watch?v={entry['id']}"
+        video_id = entry['id']
         return {
             'title': entry['title'],
-            'url': url,
-            'video_id': entry['id'],
+            'url': _YT_WATCH_PREFIX + video_id,
+            'video_id': video_id,
             'description': entry.get('description', '')
         }
     
-    @retry_on_exception(retries=3, delay=5)
     def get_transcript(self, video_id) -> Optional[str]:
+        """Get transcript for a video, from the cache or from YouTube."""
+        transcript = self.saved_transcripts.get(video_id)
+        if transcript is not None:
+            return transcript
+        
+        transcript = self._download_transcript(video_id)
+        # Only successful downloads are cached; failures may be transient
+        if transcript:
+            self.saved_transcripts[video_id] = transcript
+            self._cache_dirty = True
+        return transcript
+    
+    @retry_on_exception(retries=3, delay=2, exceptions=_TRANSIENT_ERRORS)
+    def _download_transcript(self, video_id) -> Optional[str]:
         """Get transcript for a video from YouTube."""
         try:
-            # First try to get available transcript languages
-            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-            
-            # Try to get English transcript first
+            # English transcripts resolve in a single call
             try:
-                transcript = transcript_list.find_transcript(['en'])
+                transcript_data = YouTubeTranscriptApi.get_transcript(video_id, languages=_TRANSCRIPT_LANGUAGES)
             except NoTranscriptFound:
-                # If no English transcript, try to get any transcript and translate it
-                try:
-                    transcript = transcript_list.find_transcript(['en-US', 'en-GB'])
-                except NoTranscriptFound:
-                    # Get any available transcript and translate to English
-                    transcript = transcript_list.find_manually_created_transcript()
-                    transcript = transcript.translate('en')
-
-            # Get the actual transcript data
-            transcript_data = transcript.fetch()
-            return ' '.join([entry['text'] for entry in transcript_data])
+                # Otherwise take any manually created transcript and translate it to English
+                transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+                transcript = transcript_list.find_manually_created_transcript(
+                    [available.language_code for available in transcript_list]
+                )
+                transcript_data = transcript.translate('en').fetch()
+            
+            return ' '.join(map(_segment_text, transcript_data))
 
         except TranscriptsDisabled:
             if self.verbose:
-                print(f"Warning: Transcripts are disabled for video {video_id}")
+                _warn(f"Transcripts are disabled for video {video_id}")
             return None
         except NoTranscriptFound:
             if self.verbose:
-                print(f"Warning: No transcript found for video {video_id}")
+                _warn(f"No transcript found for video {video_id}")
             return None
         except Exception as e:
             if self.verbose:
-                print(f"Warning: Could not get transcript for video {video_id}: {str(e)}")
+                _warn(f"Could not get transcript for video {video_id}: {str(e)}")
             return None
 
+    def get_transcripts_batch(
+        self,
+        video_ids: List[str],
+        max_workers: int = 16,
+        callback: Optional[Callable[[str, Optional[str]], None]] = None,
+        timing_stats: Optional[TimingStats] = None
+    ) -> Dict[str, Optional[str]]:
+        """Download transcripts for several videos concurrently, keyed by video ID.
+        
+        Each download is timed as "Transcript Download" in `timing_stats`, as when
+        videos are processed one at a time.
+        """
+        if not video_ids:
+            return {}
+        
+        transcripts = {}
+        # Each download is a blocking HTTPS round-trip, so threads overlap them well
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(video_ids)))) as executor:
+            future_to_id = {
+                executor.submit(measure_time, "Transcript Download", self.get_transcript, timing_stats, video_id): video_id
+                for video_id in video_ids
+            }
+            for future in as_completed(future_to_id):
+                video_id = future_to_id[future]
+                transcripts[video_id] = future.result()
+                if callback:
+                    callback(video_id, transcripts[video_id])
+        
+        return {video_id: transcripts[video_id] for video_id in video_ids}
+
     def _check_video_availability(self, video_id: str) -> bool:
         """Check if a video is available and not region-restricted."""
+        # Videos listed by the playlist extraction need no extra request
+        available = self._availability.get(video_id)
+        if available is not None:
+            return available
+        
         try:
             # Try to access video metadata using yt-dlp
-            with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
-                ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", 
-                               download=False,
-                               process=False)
-            return True
+            self._get_probe_ydl().extract_info(_YT_WATCH_PREFIX + video_id,
+                                               download=False,
+                                               process=False)
+            available = True
         except Exception as e:
             if self.verbose:
-                print(f"Warning: Video {video_id} is not accessible: {str(e)}")
-            return False 
\ No newline at end of file
+                _warn(f"Video {video_id} is not accessible: {str(e)}")
+            available = False
+        
+        self._availability[video_id] = available
+        return available
@@ -1,9 +1,12 @@
-import pytest
-from youtube_handler import YoutubeHandler
-from transcript_processor import TranscriptProcessor
-from markdown_generator import MarkdownGenerator
 import os
 import sys
+
+# Skip writing .pyc files for the modules imported below and by the tests
+os.environ.setdefault('PYTHONDONTWRITEBYTECODE', '1')
+sys.dont_write_bytecode = True
+
+import pytest
+from unittest.mock import patch
 from pathlib import Path
 
 # Get the project root directory
@@ -12,19 +15,71 @@ project_root = str(Path(__file__).parent.parent)
 # Add the project root directory to Python path
 sys.path.insert(0, project_root)
 
-@pytest.fixture
-def youtube_handler():
-    return YoutubeHandler()
+# Static hardware profile so no test probes the real GPUs and CPUs
+_FROZEN_SYSINFO = [
+    patch('utils.SystemInfo.get_optimal_settings', return_value={'num_gpus': 0, 'num_cpus': 4, 'num_threads': 4}),
+    patch('utils.SystemInfo.get_gpu_count', return_value=0),
+    patch('utils.SystemInfo.get_cpu_count', return_value=4),
+]
+
+@pytest.fixture(autouse=True, scope="session")
+def _freeze_sysinfo():
+    for patcher in _FROZEN_SYSINFO:
+        patcher.start()
+    yield
+    for patcher in _FROZEN_SYSINFO:
+        patcher.stop()
 
 @pytest.fixture
-def transcript_processor():
-    return TranscriptProcessor(batch_size=1, use_gpu=False)
+def real_sysinfo():
+    """Run a test against the real SystemInfo detection code."""
+    for patcher in _FROZEN_SYSINFO:
+        patcher.stop()
+    yield
+    for patcher in _FROZEN_SYSINFO:
+        patcher.start()
+
+@pytest.fixture(autouse=True)
+def reset_argument_cache():
+    """Keep cached parse_arguments results from leaking between tests."""
+    for name in ('main', 'src.main'):
+        module = sys.modules.get(name)
+        if module is not None:
+            module.clear_argument_cache()
+    yield
+
+@pytest.fixture(scope="session")
+def parser():
+    """Command line parser, built once; its defaults follow the environment."""
+    from main import _build_parser
+    return _build_parser()
 
 @pytest.fixture
-def markdown_generator():
-    return MarkdownGenerator()
+def fake_env(monkeypatch):
+    """Replace the process environment with a plain dict, avoiding putenv calls."""
+    env = {}
+    monkeypatch.setattr(os, 'environ', env)
+    monkeypatch.setattr(os, 'getenv', lambda key, default=None: env.get(key, default))
+    return env
+
+@pytest.fixture(scope="module")
+def shared_youtube_handler():
+    """One verbose handler per test module."""
+    # Imported here so collecting other test modules never loads yt-dlp.
+    # The tests patch names in src.youtube_handler, so build the handler from that module
+    from src.youtube_handler import YoutubeHandler
+    return YoutubeHandler(verbose=True)
 
 @pytest.fixture
+def youtube_handler(shared_youtube_handler):
+    """The module's handler, with state cached by earlier tests cleared."""
+    shared_youtube_handler.close()
+    shared_youtube_handler.videos = []
+    shared_youtube_handler.saved_transcripts.clear()
+    shared_youtube_handler._availability.clear()
+    return shared_youtube_handler
+
+@pytest.fixture(scope="module")
 def sample_video():
     return {
         'title': 'Test Video',
@@ -32,6 +87,17 @@ def sample_video():
         'video_id': '123456'
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_transcript():
-    return 'This is a test transcript for the video content.' 
\ No newline at end of file
+    return 'This is a test transcript for the video content.'
+
+@pytest.fixture(scope="module")
+def sample_playlist_data():
+    """Flat playlist extraction result as returned by yt-dlp."""
+    return {
+        'title': 'Test Playlist',
+        'entries': [
+            {'id': '123', 'title': 'Video 1', 'description': 'Desc 1'},
+            {'id': '456', 'title': 'Video 2', 'description': 'Desc 2'}
+        ]
+    } 
\ No newline at end of file
@@ -1,18 +1,15 @@
 import pytest
 import os
 from main import parse_arguments
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 def test_env_defaults(monkeypatch):
     # Create a temporary environment without any variables
     clean_env = {}
     monkeypatch.setattr(os, 'environ', clean_env)
     
-    # Mock the entire dotenv module
-    class MockDotEnv:
-        def load_dotenv(self, *args, **kwargs):
-            return {}
-    monkeypatch.setattr('main.load_dotenv', MockDotEnv().load_dotenv)
+    # Skip loading any .env file
+    monkeypatch.setattr('main.load_dotenv', lambda *args, **kwargs: None)
     
     # Mock sys.argv to avoid command line arguments
     monkeypatch.setattr('sys.argv', ['script.py'])
@@ -40,29 +37,39 @@ def test_env_defaults(monkeypatch):
     assert args.threads == 1
     assert not args.verbose
 
-def test_env_boolean_parsing(monkeypatch):
-    test_cases = [
-        ('true', True),
-        ('True', True),
-        ('1', True),
-        ('yes', True),
-        ('false', False),
-        ('False', False),
-        ('0', False),
-        ('no', False),
-        ('', False),
-    ]
-    
-    for env_value, expected in test_cases:
-        monkeypatch.setenv('VERBOSE', env_value)
-        args = parse_arguments()
-        assert args.verbose == expected
+@pytest.mark.parametrize("env_value,expected", [
+    ('true', True),
+    ('True', True),
+    ('1', True),
+    ('yes', True),
+    (' ON ', True),
+    ('false', False),
+    ('False', False),
+    ('0', False),
+    ('no', False),
+    ('', False),
+])
+def test_env_boolean_parsing(env_value, expected, parser, monkeypatch):
+    monkeypatch.setenv('VERBOSE', env_value)
+    args = parser.parse_args([])
+    assert args.verbose is expected
 
 def test_invalid_env_values(monkeypatch):
     monkeypatch.setenv('NUM_GPUS', 'invalid')
     with pytest.raises(ValueError):
         parse_arguments() 
 
+def test_pinned_gpu_count_skips_detection(monkeypatch, real_sysinfo):
+    monkeypatch.setenv('YT_PLAYLIST_SUMMARY_NUM_GPUS', '3')
+    monkeypatch.delenv('NUM_GPUS', raising=False)
+    monkeypatch.setattr('sys.argv', ['script.py'])
+    
+    with patch('utils._cached_gpu_count') as mock_detect:
+        args = parse_arguments()
+    
+    assert args.num_gpus == 3
+    mock_detect.assert_not_called()
+
 def test_env_playlist_url(monkeypatch):
     test_url = 'https://example.com/playlist'
     
@@ -0,0 +1,288 @@
+# © 2024 Carlos Manzanedo Rueda
+# MIT License
+
+import asyncio
+import pytest
+from llm_provider import BaseLLM, LLMConfig, RetryConfig
+
+class FakeLLM(BaseLLM):
+    """LLM stub that echoes prompts and fails on demand."""
+    def __init__(self, config: LLMConfig, failures: int = 0):
+        super().__init__(config)
+        self.failures = failures
+        self.calls = 0
+
+    def _raw_invoke(self, prompt: str, system=None) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise Exception("ThrottlingException: rate exceeded")
+        if prompt == "boom":
+            raise ValueError("invalid prompt")
+        return prompt.upper()
+
+    async def _raw_ainvoke(self, prompt: str, system=None, max_tokens=None) -> str:
+        return self._raw_invoke(prompt, system)
+
+@pytest.fixture
+def fast_retry_config():
+    return LLMConfig(retry=RetryConfig(max_retries=3, initial_delay=0.0, max_delay=0.0))
+
+def test_ainvoke_retries_throttling(fast_retry_config):
+    llm = FakeLLM(fast_retry_config, failures=2)
+    assert asyncio.run(llm.ainvoke("hello")) == "HELLO"
+    assert llm.calls == 3
+
+def test_abatch_preserves_order_and_returns_exceptions(fast_retry_config):
+    llm = FakeLLM(fast_retry_config)
+    results = asyncio.run(llm.abatch(["a", "boom", "c"], concurrency=2))
+    assert results[0] == "A"
+    assert isinstance(results[1], ValueError)
+    assert results[2] == "C"
+
+def test_bedrock_clients_are_shared(monkeypatch):
+    from llm_provider import BedrockWrapper, _get_bedrock_client
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    _get_bedrock_client.cache_clear()
+    first = BedrockWrapper(LLMConfig(model="claude"))
+    second = BedrockWrapper(LLMConfig(model="claude-haiku"))
+    assert first.client is second.client
+    _get_bedrock_client.cache_clear()
+
+def test_bedrock_uses_injected_session():
+    from llm_provider import BedrockWrapper
+    import boto3
+    session = boto3.session.Session(region_name="eu-west-1")
+    llm = BedrockWrapper(LLMConfig(model="claude"), boto_session=session)
+    assert llm.client.meta.region_name == "eu-west-1"
+
+def converse_stream_response(text, usage):
+    """Build a Converse streaming response that yields `text` in two deltas."""
+    middle = len(text) // 2
+    return {"stream": [
+        {"messageStart": {"role": "assistant"}},
+        {"contentBlockDelta": {"delta": {"text": text[:middle]}, "contentBlockIndex": 0}},
+        {"contentBlockDelta": {"delta": {"text": text[middle:]}, "contentBlockIndex": 0}},
+        {"messageStop": {"stopReason": "end_turn"}},
+        {"metadata": {"usage": usage}},
+    ]}
+
+def test_bedrock_converse_tracks_cost():
+    from unittest.mock import MagicMock
+    from llm_provider import BedrockWrapper
+    llm = BedrockWrapper(LLMConfig(model="claude"), boto_session=MagicMock())
+    llm.client.converse_stream.return_value = converse_stream_response(
+        '{"category": "Security"}', {"inputTokens": 1000, "outputTokens": 1000}
+    )
+    assert llm.invoke("prompt") == '{"category": "Security"}'
+    request = llm.client.converse_stream.call_args.kwargs
+    assert request["messages"] == [{"role": "user", "content": [{"text": "prompt"}]}]
+    assert "performanceConfig" not in request
+    assert llm.get_total_cost() == pytest.approx(0.0048)
+
+def test_bedrock_ainvoke_reuses_cached_client():
+    from unittest.mock import MagicMock
+    from llm_provider import BedrockWrapper
+    session = MagicMock()
+    llm = BedrockWrapper(LLMConfig(model="claude"), boto_session=session)
+    llm.client.converse.return_value = {
+        "output": {"message": {"content": [{"text": "ok"}]}},
+        "usage": {"inputTokens": 1000, "outputTokens": 0},
+    }
+    # Each batch runs its own event loop, and all of them share the one client
+    for batch in range(2):
+        assert asyncio.run(llm.abatch([f"p{batch}-{i}" for i in range(3)])) == ["ok"] * 3
+    assert session.client.call_count == 1
+    assert llm.client.converse.call_count == 6
+    assert llm.get_total_cost() == pytest.approx(0.0048)
+    llm.close()
+
+def test_bedrock_caches_system_prompt():
+    from unittest.mock import MagicMock
+    from llm_provider import BedrockWrapper
+    llm = BedrockWrapper(LLMConfig(model="claude"), boto_session=MagicMock())
+    llm.client.converse_stream.return_value = converse_stream_response(
+        "ok", {"inputTokens": 0, "outputTokens": 0, "cacheReadInputTokens": 1000}
+    )
+    llm.invoke("transcript", system="instructions")
+    request = llm.client.converse_stream.call_args.kwargs
+    assert request["system"] == [{"text": "instructions"}, {"cachePoint": {"type": "default"}}]
+    assert llm.get_total_cost() == pytest.approx(0.00008)
+
+@pytest.mark.parametrize("error,expected", [
+    (Exception("ThrottlingException: Rate exceeded"), True),
+    (Exception("Too many tokens, please wait"), True),
+    (Exception("Read timeout on endpoint"), True),
+    (ValueError("invalid prompt"), False),
+])
+def test_should_retry_messages(fast_retry_config, error, expected):
+    assert FakeLLM(fast_retry_config)._should_retry(error) is expected
+
+def test_should_retry_client_error_codes(fast_retry_config):
+    from botocore.exceptions import ClientError
+    llm = FakeLLM(fast_retry_config)
+    throttled = ClientError({"Error": {"Code": "ServiceUnavailableException", "Message": "busy"}}, "Converse")
+    denied = ClientError({"Error": {"Code": "AccessDeniedException", "Message": "denied"}}, "Converse")
+    assert llm._should_retry(throttled)
+    assert not llm._should_retry(denied)
+
+def test_retry_delay_uses_decorrelated_jitter():
+    config = LLMConfig(retry=RetryConfig(initial_delay=1.0, max_delay=5.0))
+    llm = FakeLLM(config)
+    for _ in range(100):
+        assert 1.0 <= llm._retry_delay(1.0) <= 3.0
+        assert llm._retry_delay(4.0) <= 5.0
+
+def test_bedrock_client_pool_size():
+    from unittest.mock import MagicMock
+    from llm_provider import BedrockWrapper
+    session = MagicMock()
+    llm = BedrockWrapper(LLMConfig(model="claude", pool_connections=64), boto_session=session)
+    session.client.assert_not_called()
+    assert llm.client is session.client.return_value
+    config = session.client.call_args.kwargs["config"]
+    assert config.max_pool_connections == 64
+    assert config.retries == {"mode": "adaptive", "max_attempts": 5}
+
+def test_response_cache_reuses_zero_temperature_responses():
+    config = LLMConfig(temperature=0.0, retry=RetryConfig(max_retries=1))
+    llm = FakeLLM(config)
+    assert llm.invoke("hello") == "HELLO"
+    assert llm.invoke("hello") == "HELLO"
+    assert "".join(llm.invoke_stream("hello")) == "HELLO"
+    assert asyncio.run(llm.ainvoke("hello")) == "HELLO"
+    assert llm.calls == 1
+    assert llm.invoke("hello", system="other instructions") == "HELLO"
+    assert llm.calls == 2
+
+def test_response_cache_skips_sampled_responses():
+    llm = FakeLLM(LLMConfig(temperature=0.7, retry=RetryConfig(max_retries=1)))
+    llm.invoke("hello")
+    llm.invoke("hello")
+    assert llm.calls == 2
+
+def test_llm_config_is_frozen_and_hashable():
+    from pydantic import ValidationError
+    config = LLMConfig(model="mistral")
+    assert hash(config) == hash(LLMConfig(model="mistral"))
+    with pytest.raises(ValidationError):
+        config.num_gpu = 1
+    with pytest.raises(ValidationError):
+        LLMConfig(unknown_option=True)
+
+def test_unknown_model_cost_is_zero():
+    from unittest.mock import MagicMock
+    from llm_provider import BedrockWrapper
+    llm = BedrockWrapper(LLMConfig(model="anthropic.unpriced-model"), boto_session=MagicMock())
+    assert llm._calculate_cost(1000, 1000) == 0.0
+
+def test_cost_is_accumulated_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    from unittest.mock import MagicMock
+    from llm_provider import BedrockWrapper
+    llm = BedrockWrapper(LLMConfig(model="claude", cost_log_interval=1000), boto_session=MagicMock())
+    usage = {"inputTokens": 1000, "outputTokens": 0}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: llm._record_usage(usage), range(200)))
+    assert llm.invocations == 200
+    assert llm.get_total_cost() == pytest.approx(200 * 0.0008)
+
+def test_ollama_wrappers_copy_validated_prototype():
+    from llm_provider import OllamaWrapper
+    config = LLMConfig(model="mistral")
+    first = OllamaWrapper(config)
+    second = OllamaWrapper(config)
+    assert first.llm is not second.llm
+    assert first.llm.model == "mistral"
+    assert first.llm._client is not second.llm._client
+    first.close()
+    second.close()
+
+class StreamingFakeLLM(FakeLLM):
+    """LLM stub that streams a fixed list of chunks and records how many were read."""
+    def __init__(self, config: LLMConfig, chunks):
+        super().__init__(config)
+        self.chunks = chunks
+        self.streamed = 0
+        self.closed = False
+
+    def _invoke_stream(self, prompt: str, system=None, max_tokens=None):
+        try:
+            for chunk in self.chunks:
+                self.streamed += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+def test_invoke_json_stops_at_complete_object():
+    llm = StreamingFakeLLM(LLMConfig(temperature=0), [' {"category', '_index": 3', '}', '\n\nExplanation', '...'])
+    assert llm.invoke_json("prompt", max_tokens=32) == '{"category_index": 3}'
+    assert llm.streamed == 3
+    assert llm.closed
+    assert llm.invoke_json("prompt") == '{"category_index": 3}'  # Served from the response cache
+    assert llm.streamed == 3
+
+def test_invoke_json_returns_full_response_without_json():
+    llm = StreamingFakeLLM(LLMConfig(), ['no ', 'json } here'])
+    assert llm.invoke_json("prompt") == 'no json } here'
+
+def test_ainvoke_json_trims_and_passes_token_cap():
+    class CappedFakeLLM(FakeLLM):
+        async def _raw_ainvoke(self, prompt: str, system=None, max_tokens=None) -> str:
+            self.max_tokens = max_tokens
+            return '{"answer": "YES"} trailing'
+
+    llm = CappedFakeLLM(LLMConfig())
+    assert asyncio.run(llm.ainvoke_json("prompt", max_tokens=16)) == '{"answer": "YES"}'
+    assert llm.max_tokens == 16
+
+def test_ollama_stream_applies_token_cap(monkeypatch):
+    from llm_provider import OllamaWrapper
+    wrapper = OllamaWrapper(LLMConfig(model="mistral"))
+    seen = []
+
+    def fake_stream(self, prompt, **kwargs):
+        seen.append((self.num_predict, prompt))
+        yield '{"answer": "YES"}'
+
+    monkeypatch.setattr(type(wrapper.llm), "stream", fake_stream)
+    assert wrapper.invoke_json("prompt", system="system", max_tokens=16) == '{"answer": "YES"}'
+    assert seen == [(16, "system\n\nprompt")]
+    assert wrapper.llm.num_predict is None
+
+def test_ollama_ainvoke_reuses_wrapper_threads(monkeypatch):
+    import threading
+    from llm_provider import OllamaWrapper
+    wrapper = OllamaWrapper(LLMConfig(model="mistral", pool_connections=2))
+    threads = set()
+
+    def fake_invoke(self, prompt, **kwargs):
+        threads.add(threading.current_thread().name)
+        return prompt
+
+    monkeypatch.setattr(type(wrapper.llm), "invoke", fake_invoke)
+    # One event loop per batch, as in main, must not add threads each time
+    for batch in range(3):
+        assert asyncio.run(wrapper.abatch([f"p{batch}-{i}" for i in range(4)])) == [f"p{batch}-{i}" for i in range(4)]
+    assert 0 < len(threads) <= 2
+    assert all(name.startswith("llm") for name in threads)
+    wrapper.close()
+
+def test_ollama_client_is_pooled_and_closed():
+    from llm_provider import OllamaWrapper, _ollama_prototype
+    config = LLMConfig(model="mistral", pool_connections=4)
+    wrapper = OllamaWrapper(config)
+    http_client = wrapper.llm._client._client
+    assert http_client._transport._pool._max_connections == 4
+    assert http_client.timeout.read is None
+
+    other = OllamaWrapper(config)
+    assert other.llm._client is not wrapper.llm._client
+
+    wrapper.close()
+    assert http_client.is_closed
+    assert wrapper.llm._async_client._client.is_closed
+    # Closing one wrapper leaves the clients of other wrappers open
+    assert not other.llm._client._client.is_closed
+    assert not other.llm._async_client._client.is_closed
+    other.close()
+    _ollama_prototype.cache_clear()
@@ -1,48 +1,31 @@
 # © 2024 Carlos Manzanedo Rueda
 # MIT License
 
+import asyncio
+import time
 import pytest
-from unittest.mock import patch
-import os
-
-# Create mock class outside the test function
-class MockSystemInfo:
-    @staticmethod
-    def get_optimal_settings(verbose=False):
-        return {
-            'num_gpus': 0,
-            'num_cpus': 4,
-            'num_threads': 4
-        }
-    
-    @staticmethod
-    def get_gpu_count(verbose=False):
-        return 0
-    
-    @staticmethod
-    def get_cpu_count():
-        return 4
-
-@patch('src.utils.SystemInfo', MockSystemInfo)
-@patch('src.utils.SystemInfo.get_cpu_count', return_value=4)
-@patch('src.utils.SystemInfo.get_gpu_count', return_value=0)
-def test_parse_arguments_defaults(mock_system_info, mock_get_gpu_count):
-    """Test default argument parsing with mocked system info."""
-    with patch('sys.argv', ['script.py']), \
-         patch.dict('os.environ', {}, clear=True), \
-         patch('dotenv.load_dotenv', return_value=None), \
-         patch('os.path.exists', return_value=False):
-        # Import parse_arguments here, after the mock is in place
-        from src.main import parse_arguments
-        args = parse_arguments()
-        assert args.playlist_url is None
-        assert args.videos is None
-        assert args.batch_size == 1
-        assert args.model == 'llama3.2'
-        assert not args.verbose
-        assert args.output is None
-
-def test_parse_arguments_with_values():
+
+@pytest.fixture(autouse=True)
+def _isolate_cli(monkeypatch):
+    """Run every test with no CLI arguments and no .env file."""
+    monkeypatch.setattr('sys.argv', ['script.py'])
+    monkeypatch.setattr('src.main.load_dotenv', lambda *args, **kwargs: None)
+    monkeypatch.setattr('os.path.exists', lambda path: False)
+
+def test_parse_arguments_defaults(fake_env):
+    """Test default argument parsing with the session's frozen system info."""
+    # Import parse_arguments here, after the mock is in place
+    from src.main import parse_arguments
+    args = parse_arguments()
+    assert args.playlist_url is None
+    assert args.videos is None
+    assert args.batch_size == 1
+    assert args.num_cpus == 4
+    assert args.model == 'llama3.2'
+    assert not args.verbose
+    assert args.output is None
+
+def test_parse_arguments_with_values(monkeypatch):
     test_args = [
         'script.py',
         '--playlist-url', 'https://youtube.com/playlist?list=123',
@@ -56,22 +39,23 @@ def test_parse_arguments_with_values():
         '-o', 'output.md'
     ]
     
-    with patch('sys.argv', test_args):
-        # Import parse_arguments here
-        from src.main import parse_arguments
-        args = parse_arguments()
-        assert args.playlist_url == 'https://youtube.com/playlist?list=123'
-        assert args.videos == 5
-        assert args.batch_size == 2
-        assert args.num_gpus == 1
-        assert args.num_cpus == 8
-        assert args.model == 'claude'
-        assert args.threads == 6
-        assert args.verbose
-        assert args.output == 'output.md'
-
-def test_parse_arguments_from_env():
-    env_vars = {
+    monkeypatch.setattr('sys.argv', test_args)
+    
+    # Import parse_arguments here
+    from src.main import parse_arguments
+    args = parse_arguments()
+    assert args.playlist_url == 'https://youtube.com/playlist?list=123'
+    assert args.videos == 5
+    assert args.batch_size == 2
+    assert args.num_gpus == 1
+    assert args.num_cpus == 8
+    assert args.model == 'claude'
+    assert args.threads == 6
+    assert args.verbose
+    assert args.output == 'output.md'
+
+def test_parse_arguments_from_env(fake_env):
+    fake_env.update({
         'PLAYLIST_URL': 'https://youtube.com/playlist?list=123',
         'VIDEOS': '5',
         'BATCH_SIZE': '2',
@@ -81,18 +65,238 @@ def test_parse_arguments_from_env():
         'THREADS': '6',
         'VERBOSE': 'true',
         'OUTPUT': 'output.md'
-    }
+    })
     
-    with patch.dict(os.environ, env_vars), patch('sys.argv', ['script.py']):
-        # Import parse_arguments here
-        from src.main import parse_arguments
-        args = parse_arguments()
-        assert args.playlist_url == 'https://youtube.com/playlist?list=123'
-        assert args.videos == 5
-        assert args.batch_size == 2
-        assert args.num_gpus == 1
-        assert args.num_cpus == 8
-        assert args.model == 'claude'
-        assert args.threads == 6
-        assert args.verbose
-        assert args.output == 'output.md' 
\ No newline at end of file
+    # Import parse_arguments here
+    from src.main import parse_arguments
+    args = parse_arguments()
+    assert args.playlist_url == 'https://youtube.com/playlist?list=123'
+    assert args.videos == 5
+    assert args.batch_size == 2
+    assert args.num_gpus == 1
+    assert args.num_cpus == 8
+    assert args.model == 'claude'
+    assert args.threads == 6
+    assert args.verbose
+    assert args.output == 'output.md'
+
+def make_videos(titles):
+    """Playlist entries whose video IDs are their titles without spaces."""
+    return [
+        {'title': title, 'video_id': title.replace(' ', '_'), 'url': f"https://www.youtube.com/watch?v={title.replace(' ', '_')}"}
+        for title in titles
+    ]
+
+class StubHandler:
+    """YoutubeHandler stand-in; the 'missing' video has no transcript."""
+    def get_transcript(self, video_id):
+        return None if video_id == 'missing' else f"Transcript of {video_id}"
+
+class StubProcessor:
+    """TranscriptProcessor stand-in whose answers depend on the video title."""
+    def __init__(self, filter_categories=(), videos_per_call=1):
+        self.filter_categories = list(filter_categories)
+        self.videos_per_call = videos_per_call
+
+    def quick_gate(self, title, transcript):
+        if title == 'gate error':
+            raise RuntimeError("gate failed")
+        return title != 'gated'
+
+    async def aquick_gate(self, title, transcript):
+        return self.quick_gate(title, transcript)
+
+    def get_category_and_summary(self, title, transcript):
+        if title == 'llm error':
+            raise RuntimeError("LLM failed")
+        return ('Other' if title == 'off topic' else 'Security'), f"Summary of {title}"
+
+    async def aget_category_and_summary(self, title, transcript):
+        await asyncio.sleep(0)
+        return self.get_category_and_summary(title, transcript)
+
+    def matches_filter(self, category):
+        return not self.filter_categories or category in self.filter_categories
+
+class RecordingProgress:
+    """Progress stand-in that sums the advances of its single task."""
+    task_ids = [0]
+
+    def __init__(self):
+        self.completed = 0.0
+
+    def update(self, task, advance=0.0, description=None):
+        self.completed += advance
+
+    def log(self, message):
+        pass
+
+class RecordingMarkdown:
+    """MarkdownGenerator stand-in that records added videos in order."""
+    def __init__(self):
+        self.videos = []
+
+    def add_video(self, category, video, summary):
+        self.videos.append((category, video['title'], summary))
+
+def test_sync_and_async_paths_agree():
+    from src.main import process_video_batch
+    videos = make_videos(['first', 'missing', 'gated', 'gate error', 'llm error', 'off topic', 'last'])
+    outcomes = {}
+    for use_async in (True, False):
+        progress, markdown = RecordingProgress(), RecordingMarkdown()
+        process_video_batch(
+            videos, StubHandler(), StubProcessor(['Security']), markdown,
+            batch_size=2, progress=progress, use_async=use_async
+        )
+        outcomes[use_async] = (sorted(markdown.videos), progress.completed)
+    assert outcomes[True] == outcomes[False]
+    added, completed = outcomes[True]
+    assert [title for _, title, _ in added] == ['first', 'last']
+    # Every video advances the bar by exactly one, however far it got
+    assert completed == pytest.approx(len(videos))
+
+class SlowFirstProcessor(StubProcessor):
+    """Processor that answers later videos first, in both call styles."""
+    def __init__(self, delays):
+        super().__init__()
+        self.delays = delays
+
+    def get_category_and_summary(self, title, transcript):
+        time.sleep(self.delays[title])
+        return super().get_category_and_summary(title, transcript)
+
+    async def aget_category_and_summary(self, title, transcript):
+        await asyncio.sleep(self.delays[title])
+        return super().get_category_and_summary(title, transcript)
+
+@pytest.mark.parametrize("use_async", [True, False])
+def test_batch_adds_results_in_playlist_order(use_async):
+    from src.main import process_video_batch
+    titles = ['one', 'two', 'three']
+    processor = SlowFirstProcessor({'one': 0.06, 'two': 0.03, 'three': 0.0})
+    markdown = RecordingMarkdown()
+    process_video_batch(make_videos(titles), StubHandler(), processor, markdown, batch_size=3, use_async=use_async)
+    assert [title for _, title, _ in markdown.videos] == titles
+
+@pytest.mark.parametrize("use_async", [True, False])
+def test_batch_skips_failed_video(use_async):
+    from src.main import process_video_batch
+    videos = make_videos(['first', 'llm error', 'last'])
+    progress, markdown = RecordingProgress(), RecordingMarkdown()
+    process_video_batch(
+        videos, StubHandler(), StubProcessor(), markdown,
+        batch_size=2, progress=progress, use_async=use_async
+    )
+    assert markdown.videos == [
+        ('Security', 'first', 'Summary of first'),
+        ('Security', 'last', 'Summary of last'),
+    ]
+    assert progress.completed == pytest.approx(len(videos))
+
+def test_batch_without_async_uses_sync_calls():
+    from src.main import process_video_batch
+
+    class SyncOnlyProcessor(StubProcessor):
+        async def aquick_gate(self, title, transcript):
+            raise AssertionError("use_async=False must not call the async gate")
+
+        async def aget_category_and_summary(self, title, transcript):
+            raise AssertionError("use_async=False must not call the async LLM")
+
+    markdown = RecordingMarkdown()
+    process_video_batch(
+        make_videos(['first', 'gated', 'last']), StubHandler(), SyncOnlyProcessor(['Security']), markdown,
+        batch_size=2, use_async=False
+    )
+    assert [title for _, title, _ in markdown.videos] == ['first', 'last']
+
+class BatchHandler(StubHandler):
+    """Handler whose downloads finish in reverse playlist order, through the real batch download."""
+    def __init__(self, delays):
+        self.delays = delays
+        self.max_workers = []
+
+    def get_transcript(self, video_id):
+        time.sleep(self.delays.get(video_id, 0.0))
+        return super().get_transcript(video_id)
+
+    def get_transcripts_batch(self, video_ids, max_workers=16, callback=None, timing_stats=None):
+        from youtube_handler import YoutubeHandler
+        self.max_workers.append(max_workers)
+        return YoutubeHandler.get_transcripts_batch(self, video_ids, max_workers, callback, timing_stats)
+
+def test_extract_transcripts_keeps_order_and_missing_videos():
+    from src.main import extract_transcripts
+    from utils import TimingStats
+    videos = make_videos(['one', 'missing', 'three'])
+    handler = BatchHandler({'one': 0.06, 'missing': 0.03})
+    timing_stats = TimingStats()
+    transcripts = extract_transcripts(videos, handler, max_workers=3, timing_stats=timing_stats)
+    assert list(transcripts) == ['one', 'missing', 'three']
+    # Each download is still timed on its own, besides the batch as a whole
+    assert timing_stats.timings['Transcript Download'][0] == 3
+    assert timing_stats.timings['Transcript Batch Download'][0] == 1
+    assert transcripts['one'] == {
+        'title': 'one', 'url': 'https://www.youtube.com/watch?v=one', 'transcript': 'Transcript of one'
+    }
+    assert transcripts['missing']['transcript'] is None
+    assert handler.max_workers == [3]
+
+def test_main_caps_transcript_download_workers(monkeypatch):
+    import src.main as main_module
+    monkeypatch.setattr('sys.argv', [
+        'script.py', '--playlist-url', 'https://youtube.com/playlist?list=123',
+        '--extract-transcripts', '--batch-size', '100'
+    ])
+    handler = BatchHandler({})
+    handler.get_playlist_videos = lambda url: (make_videos(['one']), 'Playlist')
+    handler.close = lambda: None
+    saved = []
+    monkeypatch.setattr(main_module, 'YoutubeHandler', lambda **kwargs: handler)
+    monkeypatch.setattr(main_module, 'print_configuration', lambda *args: None)
+    monkeypatch.setattr(main_module, 'save_transcripts', lambda transcripts, *args: saved.append(transcripts) or 'out.json')
+    main_module.main()
+    # 100 * 4 workers would open hundreds of connections to YouTube at once
+    assert handler.max_workers == [main_module.MAX_DOWNLOAD_WORKERS]
+    assert saved[0]['one']['transcript'] == 'Transcript of one'
+
+class GroupingProcessor(StubProcessor):
+    """Processor answering several videos per call; the first group answers last."""
+    def __init__(self, videos_per_call, filter_categories=()):
+        super().__init__(filter_categories, videos_per_call)
+        self.groups = []
+        self.fallbacks = []
+
+    def get_batch(self, items):
+        titles = [title for title, _ in items]
+        self.groups.append(titles)
+        if 'one' in titles:
+            time.sleep(0.05)
+        results = []
+        for title, transcript in items:
+            if title == 'dropped':
+                # Missing from the batch answer, so processed on its own
+                self.fallbacks.append(title)
+            try:
+                category, summary = self.get_category_and_summary(title, transcript)
+            except RuntimeError:
+                results.append(None)
+                continue
+            results.append({"category": category, "summary": summary})
+        return results
+
+def test_grouped_batch_keeps_order_and_skips_failures():
+    from src.main import process_video_batch
+    videos = make_videos(['one', 'missing', 'two', 'dropped', 'llm error', 'off topic', 'three'])
+    processor = GroupingProcessor(videos_per_call=2, filter_categories=['Security'])
+    progress, markdown = RecordingProgress(), RecordingMarkdown()
+    process_video_batch(
+        videos, StubHandler(), processor, markdown,
+        batch_size=3, progress=progress, overall_task=0
+    )
+    # Only videos with a transcript are grouped, videos_per_call at a time
+    assert sorted(processor.groups) == sorted([['one', 'two'], ['dropped', 'llm error'], ['off topic', 'three']])
+    assert processor.fallbacks == ['dropped']
+    assert [title for _, title, _ in markdown.videos] == ['one', 'two', 'dropped', 'three']
+    assert progress.completed == pytest.approx(len(videos))
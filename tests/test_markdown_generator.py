@@ -8,13 +8,32 @@ def test_markdown_generator_initialization():
     generator = MarkdownGenerator("Test Playlist")
     assert generator.playlist_title == "Test Playlist"
 
-def test_markdown_generation():
+def test_markdown_generation(sample_video):
     generator = MarkdownGenerator("Test Playlist")
-    generator.add_video("Security", 
-                       {"title": "Test Video", "url": "http://test.com"},
-                       "Test summary")
+    generator.add_video("Security", sample_video, "Test summary")
     
     content = generator.generate_markdown()
     assert "# Test Playlist" in content
     assert "<h2 id='table-of-contents'>Table of Contents</h2>" in content
-    assert "<h2 id='security'>Security</h2>" in content 
\ No newline at end of file
+    assert "<h2 id='security'>Security</h2>" in content 
+@pytest.mark.parametrize("url,expected", [
+    ("https://www.youtube.com/watch?v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+    ("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123", "dQw4w9WgXcQ"),
+    ("https://www.youtube.com/watch?list=PL123&v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+    ("https://www.youtube.com/watch?vv=dQw4w9WgXcQ", ""),
+    ("http://test.com", ""),
+])
+def test_extract_video_id(url, expected):
+    generator = MarkdownGenerator("Test Playlist")
+    assert generator._extract_video_id(url) == expected
+
+def test_add_video_stores_video_entries(sample_video):
+    from markdown_generator import VideoEntry
+    generator = MarkdownGenerator("Test Playlist")
+    generator.add_video("Security", sample_video, "Test summary")
+
+    entry = generator.categories["Security"][0]
+    assert isinstance(entry, VideoEntry)
+    assert entry.thumbnail == "https://img.youtube.com/vi/123456/0.jpg"
+    assert entry.speaker == "N/A"
+    assert not hasattr(entry, "__dict__")
@@ -3,9 +3,16 @@
 
 import pytest
 from typing import Optional
-from transcript_processor import TranscriptProcessor
 
+@pytest.fixture(scope="module")
+def processor():
+    """Shared processor for tests that only touch category filtering state."""
+    from transcript_processor import TranscriptProcessor
+    return TranscriptProcessor()
+
+@pytest.mark.slow
 def test_transcript_processor_initialization() -> None:
+    from transcript_processor import TranscriptProcessor
     processor = TranscriptProcessor(
         batch_size=2,
         num_gpus=0,
@@ -15,16 +22,195 @@ def test_transcript_processor_initialization() -> None:
     )
     assert processor.batch_size == 2
     assert processor.llm is not None
-    assert processor.batch_size == 2
     assert processor.valid_categories is not None
     assert processor.filter_categories is None
 
-def test_category_filtering():
-    processor = TranscriptProcessor()
+def test_category_filtering(processor):
     processor.set_filter_categories("Security,AI & ML")
     assert processor.filter_categories == {"security", "ai & ml"}
+    assert processor.matches_filter("Security")
+    assert not processor.matches_filter("Storage")
 
-def test_category_case_insensitive():
-    processor = TranscriptProcessor()
+def test_category_case_insensitive(processor):
     processor.set_filter_categories("security,AI & ML")
-    assert processor.filter_categories == {"security", "ai & ml"} 
\ No newline at end of file
+    assert processor.filter_categories == {"security", "ai & ml"}
+
+def test_get_category_and_summary_single_call():
+    from transcript_processor import TranscriptProcessor
+    processor = TranscriptProcessor()
+    calls = []
+
+    def fake_invoke(prompt, system=None):
+        calls.append((prompt, system))
+        return '{"category": "security", "summary": "A talk about security."}'
+
+    processor.llm.invoke = fake_invoke
+    category, summary = processor.get_category_and_summary("Title", "Transcript")
+
+    assert len(calls) == 1
+    assert category == "Security"
+    assert summary == "A talk about security."
+    assert "Security" in processor.preselected_categories
+
+def test_condense_transcript():
+    from transcript_processor import TranscriptProcessor
+    processor = TranscriptProcessor(max_context_chars=200)
+    short = "A short transcript."
+    assert processor._condense_transcript(short) == short
+
+    sentences = [f"Sentence number {i} is here." for i in range(100)]
+    condensed = processor._condense_transcript(" ".join(sentences))
+    assert len(condensed) <= 200
+    assert condensed.startswith("Sentence number 0 is here.")
+    assert "Sentence number 99 is here." in condensed
+
+    unpunctuated = " ".join(f"word{i}" for i in range(1000))
+    assert len(processor._condense_transcript(unpunctuated)) <= 200
+
+    assert processor._condense_transcript(" " * 500) == ""
+    assert processor._condense_transcript("\n" * 500) == ""
+
+def test_get_batch_falls_back_for_missing_videos():
+    from transcript_processor import TranscriptProcessor
+    processor = TranscriptProcessor(videos_per_call=3)
+    prompts = []
+
+    def fake_invoke(prompt, system=None):
+        prompts.append(prompt)
+        if len(prompts) == 1:
+            return ('{"videos": [{"index": 0, "category": "Security", "summary": "First."},'
+                    ' {"index": 2, "category": "Storage", "summary": "Third."}]}')
+        return '{"category": "Networking", "summary": "Second."}'
+
+    processor.llm.invoke = fake_invoke
+    results = processor.get_batch([("One", "a"), ("Two", "b"), ("Three", "c")])
+
+    assert len(prompts) == 2
+    assert "--- VIDEO 2 ---" in prompts[0]
+    assert [r["category"] for r in results] == ["Security", "Networking", "Storage"]
+    assert results[1]["summary"] == "Second."
+
+def test_results_are_cached_on_disk(tmp_path):
+    from transcript_processor import TranscriptProcessor
+    cache_path = str(tmp_path / "llm_cache.db")
+    calls = []
+
+    def fake_invoke(prompt, system=None):
+        calls.append(prompt)
+        return '{"category": "Security", "summary": "A talk about security."}'
+
+    processor = TranscriptProcessor(cache_path=cache_path)
+    processor.llm.invoke = fake_invoke
+    processor.get_category_and_summary("Title", "Transcript")
+    processor.close()
+
+    reopened = TranscriptProcessor(cache_path=cache_path)
+    reopened.llm.invoke = fake_invoke
+    assert reopened.get_category_and_summary("Title", "Transcript") == ("Security", "A talk about security.")
+    assert reopened.get_batch([("Title", "Transcript")]) == [{"category": "Security", "summary": "A talk about security."}]
+    assert len(calls) == 1
+    assert "Security" in reopened.preselected_categories
+    reopened.close()
+
+def test_aget_category_and_summary():
+    import asyncio
+    from transcript_processor import TranscriptProcessor
+    processor = TranscriptProcessor()
+
+    async def fake_ainvoke(prompt, system=None):
+        return '{"category": "storage", "summary": "A talk about storage."}'
+
+    processor.llm.ainvoke = fake_ainvoke
+    result = asyncio.run(processor.aget_category_and_summary("Title", "Transcript"))
+    assert result == ("Storage", "A talk about storage.")
+
+def test_valid_categories_include_operations_and_hpc():
+    from transcript_processor import TranscriptProcessor
+    processor = TranscriptProcessor()
+    assert {"Operations", "HPC"} <= processor.valid_categories
+    assert "OperationsHPC" not in processor.valid_categories
+    assert processor._resolve_category(" hpc ") == "HPC"
+    assert processor._category_system_kwargs()["preselected_categories"] == "HPC"
+
+def test_quick_gate():
+    from transcript_processor import TranscriptProcessor
+    processor = TranscriptProcessor()
+    prompts = []
+    answers = iter(['{"answer": "NO"}', '{"answer": "YES"}', 'not json'])
+
+    def fake_invoke_json(prompt, system=None, max_tokens=None):
+        prompts.append(prompt)
+        return next(answers)
+
+    processor.llm.invoke_json = fake_invoke_json
+    assert processor.quick_gate("Title", "Transcript")  # No filter, no LLM call
+    assert not prompts
+
+    processor.set_filter_categories("security,hpc")
+    assert not processor.quick_gate("Title", "x" * 5000)
+    assert "HPC, Security" in prompts[0]
+    assert "x" * 801 not in prompts[0]
+    assert processor.quick_gate("Title", "Transcript")
+    assert processor.quick_gate("Title", "Transcript")  # Unparseable answers let the video through
+
+def test_aquick_gate_caps_tokens():
+    import asyncio
+    from transcript_processor import TranscriptProcessor, _GATE_MAX_TOKENS
+    processor = TranscriptProcessor()
+    calls = []
+
+    async def fake_ainvoke_json(prompt, system=None, max_tokens=None):
+        calls.append(max_tokens)
+        return '{"answer": "NO"}'
+
+    processor.llm.ainvoke_json = fake_ainvoke_json
+    processor.set_filter_categories("security")
+    assert not asyncio.run(processor.aquick_gate("Title", "Transcript"))
+    assert calls == [_GATE_MAX_TOKENS]
+
+def test_prerendered_prompts_match_templates():
+    from transcript_processor import TranscriptProcessor
+    processor = TranscriptProcessor()
+    prompts = []
+
+    def fake_invoke(prompt, system=None):
+        prompts.append((prompt, system))
+        return '{"category": "Security", "summary": "A talk about security."}'
+
+    processor.llm.invoke = fake_invoke
+    processor.get_category_and_summary("Title {x}", "Transcript")
+    processor.get_category_and_summary("Other", "Transcript")
+
+    assert prompts[0][0] == processor.combined_prompt.format(title="Title {x}", transcript="Transcript")
+    assert "Previously used categories: Uncategorized" in prompts[0][1]
+    assert prompts[1][1] == processor.combined_system_prompt.format(
+        preselected_categories="Security",
+        categories=processor._category_menu
+    )
+
+def test_category_index_response():
+    from transcript_processor import TranscriptProcessor
+    processor = TranscriptProcessor()
+    security_index = processor._category_list.index("Security")
+    responses = iter([
+        f'{{"category_index": {security_index}}}',
+        '{"category_index": 999, "category": "storage"}',
+        '{"category_index": "not a number"}',
+    ])
+    processor.llm.invoke_json = lambda prompt, system=None, max_tokens=None: next(responses)
+
+    assert processor.get_category("Title", "Transcript") == "Security"
+    assert processor.get_category("Title", "Transcript") == "Storage"  # Out of range falls back to the name
+    assert processor.get_category("Title", "Transcript") == "Uncategorized"
+    assert f"{security_index}: Security" in processor._category_menu
+
+def test_fit_transcript_respects_context_window():
+    from transcript_processor import TranscriptProcessor
+    processor = TranscriptProcessor(max_context_chars=None)
+    assert processor.max_ctx_tokens == 16384
+    transcript = " ".join(f"Sentence number {i} is here." for i in range(20000))
+    fitted = processor._fit_transcript(transcript)
+    assert processor._estimate_tokens(fitted) <= processor.max_ctx_tokens - 2048
+
+    short = "A short transcript."
+    assert processor._fit_transcript(short) == short
@@ -1,46 +1,37 @@
 # © 2024 Carlos Manzanedo Rueda
-# © 2024 Carlos Manzanedo Rueda
 # MIT License
 
 import pytest
-from src.youtube_handler import YoutubeHandler
-from unittest.mock import patch, MagicMock
-
-@pytest.fixture
-def youtube_handler():
-    return YoutubeHandler(verbose=True)  # Remove saved_transcripts parameter
+from types import SimpleNamespace
+from unittest.mock import patch
 
 def test_youtube_handler_initialization():
+    from src.youtube_handler import YoutubeHandler
     handler = YoutubeHandler(verbose=True)
     assert handler.verbose is True
     assert handler.videos == []
     assert handler.ydl_opts == {
         'quiet': True,
         'extract_flat': True,
-        'force_generic_extractor': True
+        'skip_download': True
     }
 
 @pytest.mark.parametrize("url,expected", [
     ("https://www.youtube.com/playlist?list=123", True),
     ("https://www.youtube.com/watch?v=123&list=456", True),
     ("https://youtu.be/123?list=789", True),
+    ("https://youtube.com/playlist?list=PL_a-B9", True),
+    ("https://www.youtube.com/playlist?list=PL?x=1", False),
     ("https://youtube.com/watch?v=123", False),
     ("https://invalid.com/playlist", False),
 ])
 def test_validate_youtube_playlist_url(youtube_handler, url, expected):
     assert youtube_handler._validate_youtube_playlist_url(url) == expected
 
-@patch('yt_dlp.YoutubeDL')
-def test_get_playlist_videos_success(mock_ytdl, youtube_handler):
+@patch('yt_dlp.YoutubeDL', spec_set=True)
+def test_get_playlist_videos_success(mock_ytdl, youtube_handler, sample_playlist_data):
     # Mock the YoutubeDL response
-    mock_result = {
-        'title': 'Test Playlist',
-        'entries': [
-            {'id': '123', 'title': 'Video 1', 'description': 'Desc 1'},
-            {'id': '456', 'title': 'Video 2', 'description': 'Desc 2'}
-        ]
-    }
-    mock_ytdl.return_value.__enter__.return_value.extract_info.return_value = mock_result
+    mock_ytdl.return_value.extract_info.return_value = sample_playlist_data
 
     videos, playlist_title = youtube_handler.get_playlist_videos('https://www.youtube.com/playlist?list=123')
     
@@ -49,58 +40,77 @@ def test_get_playlist_videos_success(mock_ytdl, youtube_handler):
     assert videos[0]['video_id'] == '123'
     assert videos[1]['video_id'] == '456'
 
-@patch('src.youtube_handler.YouTubeTranscriptApi')
-def test_get_transcript_success(mock_transcript_api, youtube_handler):
-    # Create mock transcript and list
-    mock_transcript = MagicMock()
-    mock_transcript.fetch.return_value = [{'text': 'Hello'}, {'text': 'World'}]
-    
-    mock_transcript_list = MagicMock()
-    mock_transcript_list.find_transcript.return_value = mock_transcript
-    
-    # Set up the mock API
-    mock_transcript_api.list_transcripts.return_value = mock_transcript_list
-    
-    # Import actual exceptions to mock correctly
-    from youtube_transcript_api import (
-        TranscriptsDisabled,
-        NoTranscriptFound
-    )
-    
-    # Set up the exception classes on the mock
-    mock_transcript_api.TranscriptsDisabled = TranscriptsDisabled
-    mock_transcript_api.NoTranscriptFound = NoTranscriptFound
+# Transcript payloads as returned by YouTubeTranscriptApi.get_transcript, replayed without network access
+RECORDED_TRANSCRIPTS = {
+    'video_id': [
+        {'text': 'Hello', 'start': 0.0, 'duration': 1.2},
+        {'text': 'World', 'start': 1.2, 'duration': 0.8},
+    ],
+}
+
+class ReplayTranscriptApi:
+    """Stand-in for YouTubeTranscriptApi that serves RECORDED_TRANSCRIPTS and records requests."""
+    def __init__(self):
+        self.calls = []
+
+    def get_transcript(self, video_id, languages=('en',)):
+        from youtube_transcript_api import TranscriptsDisabled
+        self.calls.append((video_id, list(languages)))
+        if video_id not in RECORDED_TRANSCRIPTS:
+            raise TranscriptsDisabled(video_id)
+        return RECORDED_TRANSCRIPTS[video_id]
+
+    @staticmethod
+    def list_transcripts(video_id):
+        raise AssertionError("English transcripts must not list transcripts")
+
+@pytest.fixture
+def replay_transcript_api():
+    replay = ReplayTranscriptApi()
+    with patch('src.youtube_handler.YouTubeTranscriptApi', replay):
+        yield replay
+
+def test_get_transcript_success(replay_transcript_api, youtube_handler):
+    # English transcripts come back from a single get_transcript call
+    assert youtube_handler.get_transcript('video_id') == 'Hello World'
+    assert replay_transcript_api.calls == [('video_id', ['en', 'en-US', 'en-GB'])]
+
+def test_get_transcript_translates_other_languages(monkeypatch, youtube_handler):
+    from youtube_transcript_api import NoTranscriptFound
     
-    # Configure the find_transcript method to return our mock transcript
-    mock_transcript_list.find_transcript.side_effect = lambda langs: mock_transcript
+    def no_english(video_id, languages):
+        raise NoTranscriptFound(video_id, languages, None)
     
-    # Get the transcript
-    transcript = youtube_handler.get_transcript('video_id')
+    # Plain stubs for the transcript list: one Spanish transcript that translates to English
+    translated = SimpleNamespace(fetch=lambda: [{'text': 'Hello'}, {'text': 'World'}])
+    spanish = SimpleNamespace(language_code='es', translate={'en': translated}.__getitem__)
+    requested = []
     
-    # Verify the result
-    assert transcript == 'Hello World'
+    class StubTranscriptList(list):
+        def find_manually_created_transcript(self, language_codes):
+            requested.append(language_codes)
+            return spanish
     
-    # Verify the API was called correctly - update the patch path
-    mock_transcript_api.list_transcripts.assert_called_once_with('video_id')
-    mock_transcript_list.find_transcript.assert_called()
-    mock_transcript.fetch.assert_called_once()
-
-@patch('youtube_transcript_api.YouTubeTranscriptApi')
-def test_get_transcript_no_transcript(mock_transcript_api, youtube_handler):
-    # Mock transcript API to raise NoTranscriptFound
-    mock_transcript_api.list_transcripts.side_effect = Exception('No transcript found')
+    monkeypatch.setattr('src.youtube_handler.YouTubeTranscriptApi', SimpleNamespace(
+        get_transcript=no_english,
+        list_transcripts=lambda video_id: StubTranscriptList([spanish])
+    ))
     
-    transcript = youtube_handler.get_transcript('video_id')
-    assert transcript is None
+    assert youtube_handler.get_transcript('video_id') == 'Hello World'
+    assert requested == [['es']]
+
+def test_get_transcript_no_transcript(replay_transcript_api, youtube_handler):
+    # Videos with transcripts disabled return None instead of raising
+    assert youtube_handler.get_transcript('disabled_video') is None
 
 def test_get_playlist_videos_invalid_url(youtube_handler):
     with pytest.raises(ValueError, match="Invalid YouTube playlist URL"):
         youtube_handler.get_playlist_videos("https://invalid.com/playlist")
 
-@patch('yt_dlp.YoutubeDL')
+@patch('yt_dlp.YoutubeDL', spec_set=True)
 def test_get_playlist_videos_empty_playlist(mock_ytdl, youtube_handler):
     # Mock empty playlist response
-    mock_ytdl.return_value.__enter__.return_value.extract_info.return_value = {
+    mock_ytdl.return_value.extract_info.return_value = {
         'title': 'Empty Playlist',
         'entries': []
     }
@@ -108,4 +118,54 @@ def test_get_playlist_videos_empty_playlist(mock_ytdl, youtube_handler):
     with pytest.raises(ValueError) as exc_info:
         youtube_handler.get_playlist_videos('https://www.youtube.com/playlist?list=123')
     
-    assert "No accessible videos found in the playlist" in str(exc_info.value) 
\ No newline at end of file
+    assert "No accessible videos found in the playlist" in str(exc_info.value) 
+
+@patch('yt_dlp.YoutubeDL', spec_set=True)
+def test_youtube_dl_instance_is_reused(mock_ytdl, youtube_handler, sample_playlist_data):
+    mock_ytdl.return_value.extract_info.return_value = sample_playlist_data
+
+    youtube_handler.get_playlist_videos('https://www.youtube.com/playlist?list=123')
+    youtube_handler.get_playlist_videos('https://www.youtube.com/playlist?list=123')
+
+    mock_ytdl.assert_called_once_with(youtube_handler.ydl_opts)
+    youtube_handler.close()
+    mock_ytdl.return_value.close.assert_called_once()
+
+def test_get_transcripts_batch(youtube_handler):
+    done = []
+    with patch.object(youtube_handler, 'get_transcript', side_effect=lambda vid: None if vid == 'b' else f"text {vid}"):
+        transcripts = youtube_handler.get_transcripts_batch(['a', 'b', 'c'], callback=lambda vid, _: done.append(vid))
+
+    assert list(transcripts) == ['a', 'b', 'c']
+    assert transcripts == {'a': 'text a', 'b': None, 'c': 'text c'}
+    assert sorted(done) == ['a', 'b', 'c']
+
+def test_transcript_cache_round_trip(tmp_path):
+    cache_path = str(tmp_path / 'transcripts.pkl')
+    from src.youtube_handler import YoutubeHandler
+    handler = YoutubeHandler(cache_path=cache_path)
+    with patch.object(handler, '_download_transcript', return_value='Hello World') as mock_download:
+        assert handler.get_transcript('video_id') == 'Hello World'
+        assert handler.get_transcript('video_id') == 'Hello World'
+    mock_download.assert_called_once_with('video_id')
+    handler.save_transcript_cache()
+
+    # A new handler reads the transcript back without downloading it
+    reloaded = YoutubeHandler(cache_path=cache_path)
+    with patch.object(reloaded, '_download_transcript') as mock_download:
+        assert reloaded.get_transcript('video_id') == 'Hello World'
+    mock_download.assert_not_called()
+
+@patch('yt_dlp.YoutubeDL', spec_set=True)
+def test_check_video_availability_uses_playlist_entries(mock_ytdl, youtube_handler, sample_playlist_data):
+    mock_ytdl.return_value.extract_info.return_value = sample_playlist_data
+    youtube_handler.get_playlist_videos('https://www.youtube.com/playlist?list=123')
+    mock_ytdl.return_value.extract_info.reset_mock()
+
+    assert youtube_handler._check_video_availability('123') is True
+    mock_ytdl.return_value.extract_info.assert_not_called()
+
+    # Unknown videos are probed once and the answer is remembered
+    assert youtube_handler._check_video_availability('789') is True
+    assert youtube_handler._check_video_availability('789') is True
+    mock_ytdl.return_value.extract_info.assert_called_once()